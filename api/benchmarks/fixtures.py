@@ -0,0 +1,91 @@
+import random
+from PIL import Image, ImageDraw
+from typing import List
+
+from schemas.summarization_schemas import Summary
+
+WORDS = [
+    "python", "engenharia", "dados", "backend", "fastapi", "celery", "mongodb", "docker", "kubernetes",
+    "liderança", "projeto", "experiência", "desenvolvedor", "sênior", "análise", "machine", "learning",
+    "graduação", "certificação", "inglês", "avançado", "entregas", "impacto", "equipe", "arquitetura"
+]
+
+
+def random_cv_lines(lines_count: int, seed: int) -> List[str]:
+    generator = random.Random(seed)
+    return [" ".join(generator.choice(WORDS) for _ in range(10)) for _ in range(lines_count)]
+
+
+def escape_pdf_text(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf_cv(filepath: str, pages: int = 2, lines_per_page: int = 40, seed: int = 0) -> str:
+    pages_count = max(pages, 1)
+    font_id = 3
+    first_page_id = 4
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        font_id: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    }
+
+    page_ids = []
+    for page_index in range(pages_count):
+        page_id = first_page_id + page_index * 2
+        content_id = page_id + 1
+        page_ids.append(page_id)
+
+        text_lines = random_cv_lines(lines_per_page, seed * 1000 + page_index)
+        content = "BT /F1 9 Tf 40 800 Td 12 TL " + " ".join(
+            f"({escape_pdf_text(line)}) '" for line in text_lines
+        ) + " ET"
+        content_bytes = content.encode("cp1252", errors="replace")
+
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode()
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(content_bytes) + content_bytes + b"\nendstream"
+
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(f'{page_id} 0 R' for page_id in page_ids)}] /Count {pages_count} >>".encode()
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(output)
+        output += b"%d 0 obj\n" % object_id + objects[object_id] + b"\nendobj\n"
+
+    xref_offset = len(output)
+    objects_count = max(objects) + 1
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % objects_count
+    for object_id in range(1, objects_count):
+        output += b"%010d 00000 n \n" % offsets[object_id]
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (objects_count, xref_offset)
+
+    with open(filepath, "wb") as pdf_file:
+        pdf_file.write(bytes(output))
+
+    return filepath
+
+
+def make_image_cv(filepath: str, lines: int = 30, seed: int = 0) -> str:
+    image = Image.new("RGB", (1240, 40 + lines * 28), "white")
+    draw = ImageDraw.Draw(image)
+
+    for line_index, line in enumerate(random_cv_lines(lines, seed)):
+        draw.text((40, 20 + line_index * 28), line, fill="black")
+
+    image.save(filepath)
+    return filepath
+
+
+def make_summary(seed: int = 0) -> Summary:
+    generator = random.Random(seed)
+    sentences = [" ".join(line.split()[:8]).capitalize() + "." for line in random_cv_lines(12, seed)]
+
+    return Summary(
+        summary=" ".join(sentences[:6]),
+        strong_points=sentences[6:9],
+        weak_points=sentences[9:],
+        score=round(generator.uniform(1.0, 10.0), 1)
+    )
@@ -0,0 +1,42 @@
+"""
+Measures the per-task overhead of getting a Gemini client, comparing the previous behavior
+(a new GeminiLLM on every task) with the per-process client returned by get_llm_provider.
+
+No request is sent to Gemini: only configure(), the GenerativeModel and the instructor wrapper are built.
+
+Usage (from the api folder, with the same .env used by the worker and LLM_PROVIDER=gemini):
+
+    python -m benchmarks.llm_client_overhead --tasks 200
+"""
+import argparse
+import time
+
+from services.llm.llm_summarizer import GeminiLLM
+from services.llm.llm_provider import get_llm_provider
+
+
+def measure(get_client, tasks: int) -> float:
+    start = time.perf_counter()
+    for _ in range(tasks):
+        get_client()
+
+    return (time.perf_counter() - start) / tasks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gemini client per-task overhead benchmark")
+    parser.add_argument("--tasks", type=int, default=200)
+    args = parser.parse_args()
+
+    per_task = measure(GeminiLLM, args.tasks)
+    get_llm_provider()
+    per_process = measure(get_llm_provider, args.tasks)
+
+    print(f"{'mode':>12} | {'per task':>12}")
+    print(f"{'per task':>12} | {per_task * 1e6:>9.1f} us")
+    print(f"{'per process':>12} | {per_process * 1e6:>9.1f} us")
+    print(f"speedup: {per_task / per_process:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Compares the legacy PDF extraction (two re.sub passes per page, full page list) with the
+serial streaming and the process pool extraction of services/extraction/pdf.py.
+
+Usage (from the api folder, with the same .env used by the worker):
+
+    python -m benchmarks.pdf_extraction_benchmark --pages 1 4 16 64 --repeat 5
+"""
+import re
+import time
+import argparse
+import tempfile
+import statistics
+from pypdf import PdfReader
+
+from benchmarks.fixtures import make_pdf_cv
+from services.extraction.pdf import iter_pdf_pages_text, iter_pdf_pages_text_parallel
+from services.extraction.process_pool import get_extraction_pool, shutdown_extraction_pool
+
+
+def legacy_extract_pdf_text(filepath: str) -> str:
+    reader = PdfReader(filepath)
+
+    pages_text = []
+    for page in reader.pages:
+        page_text = page.extract_text()
+        page_text = re.sub(r'\n', ' ', page_text)
+        page_text = re.sub(r'\s+', ' ', page_text)
+        pages_text.append(page_text)
+
+    return '\n\n'.join(pages_text)
+
+
+def serial_extract_pdf_text(filepath: str) -> str:
+    return '\n\n'.join(iter_pdf_pages_text(PdfReader(filepath)))
+
+
+def parallel_extract_pdf_text(filepath: str) -> str:
+    return '\n\n'.join(iter_pdf_pages_text_parallel(filepath, len(PdfReader(filepath).pages)))
+
+
+def time_extraction(extractor, filepath: str, repeat: int) -> float:
+    durations = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        extractor(filepath)
+        durations.append(time.perf_counter() - start_time)
+
+    return statistics.median(durations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="PDF extraction benchmark")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    extractors = {
+        "legacy": legacy_extract_pdf_text,
+        "serial": serial_extract_pdf_text,
+        "parallel": parallel_extract_pdf_text,
+    }
+
+    # Warm up the pool so process startup is not charged to the first measurement
+    get_extraction_pool().submit(len, "").result()
+
+    print(f"{'pages':>6} | " + " | ".join(f"{name:>12}" for name in extractors) + " | speedup")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for pages in args.pages:
+            filepath = make_pdf_cv(f"{temp_dir}/cv_{pages}.pdf", pages=pages, seed=pages)
+
+            assert legacy_extract_pdf_text(filepath) == parallel_extract_pdf_text(filepath)
+
+            timings = {name: time_extraction(extractor, filepath, args.repeat) for name, extractor in extractors.items()}
+            best = min(timings["serial"], timings["parallel"])
+            print(
+                f"{pages:>6} | " + " | ".join(f"{timings[name]*1000:>10.1f}ms" for name in extractors)
+                + f" | {timings['legacy'] / best:>6.2f}x"
+            )
+
+    shutdown_extraction_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Measures the input size of the "CVs texts" sent to rank_cvs, comparing the previous Python repr
+of the List[Summary] with the compact encoding of services/llm/prompt_encoding.py.
+
+Usage (from the api folder, with the same .env used by the worker):
+
+    python -m benchmarks.ranking_prompt_tokens --batch-sizes 5 25 100
+    python -m benchmarks.ranking_prompt_tokens --batch-sizes 25 --gemini   # exact counts through the Gemini API
+"""
+import argparse
+
+from benchmarks.fixtures import make_summary
+from services.llm.prompt_encoding import encode_summaries, estimate_tokens
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ranking prompt size benchmark")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[5, 25, 100])
+    parser.add_argument("--gemini", action="store_true", help="Count tokens with the Gemini API instead of estimating")
+    args = parser.parse_args()
+
+    token_counter = estimate_tokens
+    if args.gemini:
+        from services.llm.llm_summarizer import GeminiLLM
+
+        gemini_service = GeminiLLM()
+        token_counter = lambda text: gemini_service.count_tokens("benchmark", text)
+
+    print(f"{'cvs':>5} | {'repr chars':>10} | {'repr tokens':>11} | {'compact chars':>13} | {'compact tokens':>14} | saved")
+    for batch_size in args.batch_sizes:
+        summaries = [make_summary(seed) for seed in range(batch_size)]
+
+        repr_text = f"{summaries}"
+        compact_text = encode_summaries(dict(enumerate(summaries)))
+        repr_tokens = token_counter(repr_text)
+        compact_tokens = token_counter(compact_text)
+
+        print(
+            f"{batch_size:>5} | {len(repr_text):>10} | {repr_tokens:>11} | {len(compact_text):>13} | {compact_tokens:>14} | "
+            f"{1 - compact_tokens / repr_tokens:>5.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
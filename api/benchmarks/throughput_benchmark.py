@@ -0,0 +1,267 @@
+"""
+End-to-end throughput of the summarize pipeline with synthetic PDF and image CVs, with the per-stage
+breakdown read from the metrics the worker saves on each log.
+
+Two modes:
+
+- local: runs the real summarize_cv task in-process (Celery's apply), on a pool of worker processes, with the
+  stub LLM provider: blob store upload, extraction and OCR, caches, progress and partial results writes,
+  summarization, ranking and the LogRepository result write. It needs the MongoDB of the .env (the same used
+  by the worker), but no broker, API or Gemini quota: log events are published to an in-memory transport.
+  The caches are disabled unless --cache is given, as every request sends the same files.
+- http: drives a running stack through POST /api/summarize and polls GET /api/logs/{request_id}. Start the
+  worker with LLM_PROVIDER=stub; the worker count is the one deployed (WORKER_POOL/WORKER_CONCURRENCY).
+
+Usage (from the api folder, with the same .env used by the worker):
+
+    python -m benchmarks.throughput_benchmark local --batch-sizes 1 10 50 --workers 1 2 4 --requests 8
+    python -m benchmarks.throughput_benchmark http --base-url http://localhost:8000 --batch-sizes 10 --concurrency 4
+"""
+import os
+
+# Must be set before core.config is imported, also by the spawned worker processes. The chord of the fan-out
+# mode needs a broker, so the local mode runs the serial task
+os.environ["LLM_PROVIDER"] = "stub"
+os.environ["SUMMARIZATION_FAN_OUT"] = "false"
+
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import statistics
+import multiprocessing
+from uuid import uuid4
+from datetime import datetime
+from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from benchmarks.fixtures import make_pdf_cv, make_image_cv
+from core.config import env_config
+from models.process_status_enum import ProcessStatusEnum
+from schemas.log_schemas import CreateLogSchema
+from schemas.staging_schemas import StagedFileSchema
+from services.storage.blob_store import BlobStore, build_blob_key, get_blob_store
+
+# upload is timed by the benchmark, the other stages are read from the log metrics
+STAGES = ["upload", "fetch", "extract", "ocr", "summarize", "pre_rank", "rank", "db"]
+QUERY = "Desenvolvedor backend sênior com experiência em python, fastapi, celery e mongodb"
+
+
+def make_fixtures(temp_dir: str, batch_size: int, image_ratio: float) -> List[str]:
+    images_count = round(batch_size * image_ratio)
+    pdf_files = [make_pdf_cv(f"{temp_dir}/cv_{index}.pdf", pages=2, seed=index) for index in range(batch_size - images_count)]
+    image_files = [make_image_cv(f"{temp_dir}/cv_{index}.png", seed=index) for index in range(images_count)]
+
+    return pdf_files + image_files
+
+
+def get_content_type(filepath: str) -> str:
+    return "application/pdf" if filepath.endswith(".pdf") else "image/png"
+
+
+def percentile(values: List[float], percent: int) -> float:
+    if len(values) == 1:
+        return values[0]
+
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+def format_stages(results: List[Dict[str, float]]) -> str:
+    return " | ".join(f"{statistics.mean(timings.get(stage, 0.0) for timings in results) * 1000:>7.0f}ms" for stage in STAGES)
+
+
+async def upload_files(blob_store: BlobStore, request_id: str, filepaths: List[str]) -> List[StagedFileSchema]:
+    async def read_chunks(filepath: str, file_hash):
+        with open(filepath, "rb") as source_file:
+            while chunk := source_file.read(env_config.UPLOAD_CHUNK_SIZE_BYTES):
+                file_hash.update(chunk)
+                yield chunk
+
+    staged_files = []
+    for filepath in filepaths:
+        content_type = get_content_type(filepath)
+        blob_key = build_blob_key(request_id, content_type)
+        file_hash = hashlib.sha256()
+        await blob_store.put(blob_key, read_chunks(filepath, file_hash))
+
+        staged_files.append(StagedFileSchema(
+            blob_key=blob_key,
+            original_filename=os.path.basename(filepath),
+            content_type=content_type,
+            sha256=file_hash.hexdigest(),
+            size=os.path.getsize(filepath)
+        ))
+
+    return staged_files
+
+
+def init_local_worker() -> None:
+    from worker.config import app as celery_app
+
+    celery_app.conf.broker_url = "memory://"
+
+
+def run_local_request(filepaths: List[str]) -> Dict[str, float]:
+    from worker.runtime import run_async
+    from worker.summarize import summarize_cv
+    from repositories.logs_repository import LogRepository
+
+    request_id = str(uuid4())
+    timings = {}
+
+    start_time = time.perf_counter()
+    staged_files = run_async(upload_files(get_blob_store(), request_id, filepaths))
+    run_async(LogRepository.create(request_id, CreateLogSchema(
+        created_at=datetime.utcnow(),
+        request_id=request_id,
+        user_id=0,
+        timestamp=datetime.utcnow(),
+        query=QUERY,
+        status=ProcessStatusEnum.PENDING
+    )))
+    timings["upload"] = time.perf_counter() - start_time
+
+    summarize_cv.apply(args=(request_id, [staged_file.model_dump() for staged_file in staged_files], QUERY))
+    timings["total"] = time.perf_counter() - start_time
+
+    log_entry = run_async(LogRepository.get_by_id(request_id, request_id))
+    if log_entry.metrics is not None:
+        timings.update({stage: seconds for stage, seconds in log_entry.metrics.stages_seconds.items() if stage != "total"})
+    timings["failed"] = float(log_entry.status == ProcessStatusEnum.FAILED)
+    run_async(log_entry.delete())
+
+    return timings
+
+
+def warm_up_worker(_: int) -> str:
+    from worker.runtime import get_worker_loop
+    from services.llm.llm_provider import get_llm_provider
+
+    get_worker_loop()
+    return type(get_llm_provider()).__name__
+
+
+def run_local(args: argparse.Namespace) -> None:
+    image_ratio = args.image_ratio
+    if image_ratio > 0 and shutil.which("tesseract") is None:
+        print("tesseract not found, running with PDF CVs only")
+        image_ratio = 0.0
+
+    # Inherited by the spawned worker processes
+    os.environ["SUMMARY_CACHE_ENABLED"] = str(args.cache).lower()
+    os.environ["EXTRACTION_CACHE_ENABLED"] = str(args.cache).lower()
+
+    print(f"{'cvs':>5} | {'workers':>7} | {'p50':>8} | {'p95':>8} | {'cvs/s':>7} | failed | " + " | ".join(f"{stage:>9}" for stage in STAGES))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for batch_size in args.batch_sizes:
+            fixtures_dir = f"{temp_dir}/fixtures_{batch_size}"
+            os.makedirs(fixtures_dir)
+            filepaths = make_fixtures(fixtures_dir, batch_size, image_ratio)
+
+            for workers in args.workers:
+                requests_count = args.requests or workers * 2
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_local_worker
+                ) as executor:
+                    # Warm up every worker process so imports, the database connection and client setup are not measured
+                    list(executor.map(warm_up_worker, range(workers)))
+
+                    start_time = time.perf_counter()
+                    futures = [executor.submit(run_local_request, filepaths) for _ in range(requests_count)]
+                    results = [future.result() for future in futures]
+                    wall_time = time.perf_counter() - start_time
+
+                latencies = [timings["total"] for timings in results]
+                print(
+                    f"{batch_size:>5} | {workers:>7} | {percentile(latencies, 50):>7.2f}s | {percentile(latencies, 95):>7.2f}s | "
+                    f"{requests_count * batch_size / wall_time:>7.2f} | {int(sum(timings['failed'] for timings in results)):>6} | "
+                    + format_stages(results)
+                )
+
+
+def run_http_request(client, base_url: str, filepaths: List[str], poll_interval: float, timeout: float) -> Dict[str, float]:
+    files = [("files", (os.path.basename(filepath), open(filepath, "rb"), get_content_type(filepath))) for filepath in filepaths]
+    timings = {}
+
+    start_time = time.perf_counter()
+    try:
+        response = client.post(f"{base_url}/api/summarize", data={"user_id": "1", "query": QUERY}, files=files)
+        response.raise_for_status()
+    finally:
+        for _, (_, file_object, _) in files:
+            file_object.close()
+    timings["upload"] = time.perf_counter() - start_time
+
+    request_id = response.json()["request_id"]
+    while time.perf_counter() - start_time < timeout:
+        log_entry = client.get(f"{base_url}/api/logs/{request_id}").json()
+        if log_entry["status"] != "PENDING":
+            timings["total"] = time.perf_counter() - start_time
+            timings["failed"] = float(log_entry["status"] == "FAILED")
+            stages_seconds = (log_entry.get("metrics") or {}).get("stages_seconds", {})
+            timings.update({stage: seconds for stage, seconds in stages_seconds.items() if stage != "total"})
+            return timings
+
+        time.sleep(poll_interval)
+
+    raise TimeoutError(f"Request {request_id} still pending after {timeout}s")
+
+
+def run_http(args: argparse.Namespace) -> None:
+    import httpx
+
+    print(f"{'cvs':>5} | {'clients':>7} | {'p50':>8} | {'p95':>8} | {'cvs/s':>7} | failed | " + " | ".join(f"{stage:>9}" for stage in STAGES))
+    with tempfile.TemporaryDirectory() as temp_dir, httpx.Client(timeout=60) as client:
+        for batch_size in args.batch_sizes:
+            fixtures_dir = f"{temp_dir}/fixtures_{batch_size}"
+            os.makedirs(fixtures_dir)
+            filepaths = make_fixtures(fixtures_dir, batch_size, args.image_ratio)
+            requests_count = args.requests or args.concurrency * 2
+
+            start_time = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                results = list(executor.map(
+                    lambda _: run_http_request(client, args.base_url, filepaths, args.poll_interval, args.timeout),
+                    range(requests_count)
+                ))
+            wall_time = time.perf_counter() - start_time
+
+            latencies = [timings["total"] for timings in results]
+            print(
+                f"{batch_size:>5} | {args.concurrency:>7} | {percentile(latencies, 50):>7.2f}s | {percentile(latencies, 95):>7.2f}s | "
+                f"{requests_count * batch_size / wall_time:>7.2f} | {int(sum(timings['failed'] for timings in results)):>6} | "
+                + format_stages(results)
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize pipeline throughput benchmark")
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    local_parser = subparsers.add_parser("local", help="Run the summarize_cv task in-process with the stub LLM")
+    local_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    local_parser.add_argument("--cache", action="store_true", help="Keep the summary and extraction caches enabled")
+
+    http_parser = subparsers.add_parser("http", help="Drive a running API and worker")
+    http_parser.add_argument("--base-url", default="http://localhost:8000")
+    http_parser.add_argument("--concurrency", type=int, default=4, help="Concurrent clients")
+    http_parser.add_argument("--poll-interval", type=float, default=0.5)
+    http_parser.add_argument("--timeout", type=float, default=600)
+
+    for subparser in (local_parser, http_parser):
+        subparser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 50])
+        subparser.add_argument("--requests", type=int, default=0, help="Requests per configuration (default: 2 per worker/client)")
+        subparser.add_argument("--image-ratio", type=float, default=0.2, help="Share of image CVs on each batch")
+
+    args = parser.parse_args()
+    if args.mode == "local":
+        run_local(args)
+    else:
+        run_http(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,5 +13,44 @@ env_config = ConfigClass(
     RABBITMQ_DEFAULT_HOST=os.getenv('RABBITMQ_DEFAULT_HOST'),
     RABBITMQ_DEFAULT_PORT=os.getenv('RABBITMQ_DEFAULT_PORT'),
     MONGODB_DB_NAME=os.getenv("MONGO_DB_NAME"),
-    MONGODB_URL=f"mongodb://{os.getenv('MONGO_INITDB_ROOT_USERNAME')}:{os.getenv('MONGO_INITDB_ROOT_PASSWORD')}@{os.getenv('MONGO_HOST')}:{os.getenv('MONGO_PORT')}/{os.getenv('MONGO_DB_NAME')}?authSource={os.getenv('MONGO_INITDB_ROOT_USERNAME')}"
-)
\ No newline at end of file
+    MONGODB_URL=f"mongodb://{os.getenv('MONGO_INITDB_ROOT_USERNAME')}:{os.getenv('MONGO_INITDB_ROOT_PASSWORD')}@{os.getenv('MONGO_HOST')}:{os.getenv('MONGO_PORT')}/{os.getenv('MONGO_DB_NAME')}?authSource={os.getenv('MONGO_INITDB_ROOT_USERNAME')}",
+    SUMMARIZATION_FAN_OUT=os.getenv('SUMMARIZATION_FAN_OUT', 'false'),
+    LLM_MAX_CONCURRENCY=os.getenv('LLM_MAX_CONCURRENCY', '4'),
+    SUMMARY_CACHE_ENABLED=os.getenv('SUMMARY_CACHE_ENABLED', 'true'),
+    SUMMARY_CACHE_TTL_SECONDS=os.getenv('SUMMARY_CACHE_TTL_SECONDS', '604800'),
+    SUMMARY_CACHE_MAX_ENTRIES=os.getenv('SUMMARY_CACHE_MAX_ENTRIES', '10000'),
+    EXTRACTION_CACHE_ENABLED=os.getenv('EXTRACTION_CACHE_ENABLED', 'true'),
+    EXTRACTION_CACHE_TTL_SECONDS=os.getenv('EXTRACTION_CACHE_TTL_SECONDS', '604800'),
+    EXTRACTION_CACHE_MAX_ENTRIES=os.getenv('EXTRACTION_CACHE_MAX_ENTRIES', '10000'),
+    EXTRACTION_MAX_WORKERS=os.getenv('EXTRACTION_MAX_WORKERS', str(os.cpu_count() or 1)),
+    PDF_PARALLEL_EXTRACTION=os.getenv('PDF_PARALLEL_EXTRACTION', 'true'),
+    PDF_PARALLEL_MIN_PAGES=os.getenv('PDF_PARALLEL_MIN_PAGES', '8'),
+    MAX_UPLOAD_SIZE_BYTES=os.getenv('MAX_UPLOAD_SIZE_BYTES', '20971520'),
+    MAX_REQUEST_SIZE_BYTES=os.getenv('MAX_REQUEST_SIZE_BYTES', '104857600'),
+    UPLOAD_CHUNK_SIZE_BYTES=os.getenv('UPLOAD_CHUNK_SIZE_BYTES', '1048576'),
+    UPLOAD_STAGING_DIR=os.getenv('UPLOAD_STAGING_DIR', '/tmp/uploads'),
+    STAGING_MAX_AGE_SECONDS=os.getenv('STAGING_MAX_AGE_SECONDS', '86400'),
+    STAGING_SWEEP_INTERVAL_SECONDS=os.getenv('STAGING_SWEEP_INTERVAL_SECONDS', '3600'),
+    BLOB_STORE_BACKEND=os.getenv('BLOB_STORE_BACKEND', 'local'),
+    GRIDFS_BUCKET_NAME=os.getenv('GRIDFS_BUCKET_NAME', 'cv_uploads'),
+    WORKER_SCRATCH_DIR=os.getenv('WORKER_SCRATCH_DIR', '/tmp/scratch'),
+    PRE_RANKING_ENABLED=os.getenv('PRE_RANKING_ENABLED', 'false'),
+    PRE_RANKING_TOP_K=os.getenv('PRE_RANKING_TOP_K', '20'),
+    PRE_RANKING_MODEL=os.getenv('PRE_RANKING_MODEL', 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'),
+    RANKING_CHUNK_SIZE=os.getenv('RANKING_CHUNK_SIZE', '25'),
+    RANKING_FINALISTS_PER_CHUNK=os.getenv('RANKING_FINALISTS_PER_CHUNK', '5'),
+    RATE_LIMIT_ENABLED=os.getenv('RATE_LIMIT_ENABLED', 'true'),
+    GEMINI_REQUESTS_PER_MINUTE=os.getenv('GEMINI_REQUESTS_PER_MINUTE', '15'),
+    GEMINI_TOKENS_PER_MINUTE=os.getenv('GEMINI_TOKENS_PER_MINUTE', '1000000'),
+    WORKER_POOL=os.getenv('WORKER_POOL', 'threads'),
+    WORKER_CONCURRENCY=os.getenv('WORKER_CONCURRENCY', '2'),
+    LLM_PROVIDER=os.getenv('LLM_PROVIDER', 'gemini'),
+    LLM_STUB_LATENCY_SECONDS=os.getenv('LLM_STUB_LATENCY_SECONDS', '1.0'),
+    LLM_STUB_LATENCY_JITTER_SECONDS=os.getenv('LLM_STUB_LATENCY_JITTER_SECONDS', '0.5'),
+    LLM_STUB_ERROR_RATE=os.getenv('LLM_STUB_ERROR_RATE', '0.0'),
+    LLM_STUB_SEED=os.getenv('LLM_STUB_SEED', '42'),
+    WORKER_METRICS_PORT=os.getenv('WORKER_METRICS_PORT', '9808'),
+    LOG_EVENTS_KEEPALIVE_SECONDS=os.getenv('LOG_EVENTS_KEEPALIVE_SECONDS', '15.0'),
+    LOG_CACHE_MAX_ENTRIES=os.getenv('LOG_CACHE_MAX_ENTRIES', '1024'),
+    LOG_CACHE_TTL_SECONDS=os.getenv('LOG_CACHE_TTL_SECONDS', '300.0')
+)
@@ -7,6 +7,8 @@ from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 
 from core.config import env_config
 from models.logs import CVsAnalysisLogs
+from models.summary_cache import CVSummaryCache
+from models.extraction_cache import CVTextCache
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +26,7 @@ class MongoDBManager:
         if not hasattr(self, "_initialized"):
             self._client: Optional[AsyncIOMotorClient] = None
             self._db: Optional[AsyncIOMotorDatabase] = None
-            self._document_models = [CVsAnalysisLogs]
+            self._document_models = [CVsAnalysisLogs, CVSummaryCache, CVTextCache]
             self._initialized = True
             logger.debug("MongoDBManager initialized")
     
@@ -1,26 +1,54 @@
+import time
+import asyncio
 import logging
 from uuid import uuid4
 from starlette.requests import Request
 from fastapi import FastAPI, Depends
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+
+from core.config import env_config
 
 from core.database import MongoDBManager
 from routes.logs_route import logs_router
+from routes.metrics_route import metrics_router
 from routes.healthcheck_route import healthcheck_router
 from routes.cv_summarization_route import summaries_router
+from services.storage.blob_store import get_blob_store
+from services.storage.uploads import RequestSizeLimitMiddleware
+from services.metrics.prometheus_metrics import HTTP_REQUEST_SECONDS
+from services.notifications.log_events import log_events_hub
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+async def sweep_staged_uploads_periodically():
+    while True:
+        try:
+            removed_uploads = await get_blob_store().sweep_expired()
+            if removed_uploads:
+                logger.info(f"Removed {removed_uploads} orphaned staged uploads")
+        except Exception as e:
+            logger.error(f"Error sweeping orphaned staged uploads: {str(e)}")
+
+        await asyncio.sleep(env_config.STAGING_SWEEP_INTERVAL_SECONDS)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     db_manager = MongoDBManager.get_db_instance()
 
     await db_manager.connect()
     logger.info("MongoDB connected and initialized")
+
+    staging_sweeper = asyncio.create_task(sweep_staged_uploads_periodically())
+    log_events_hub.start(asyncio.get_running_loop())
     
     yield 
 
+    log_events_hub.stop()
+    staging_sweeper.cancel()
+    with suppress(asyncio.CancelledError):
+        await staging_sweeper
+
     await db_manager.disconnect()
     logger.info("Application shutting down")
 
@@ -39,6 +67,27 @@ async def add_request_id_middleware(request: Request, call_next):
     response.headers["X-Request-ID"] = request_id
     return response
 
+@app.middleware("http")
+async def record_request_metrics_middleware(request: Request, call_next):
+    start_time = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        # Route templates instead of raw paths, so request ids don't explode the label cardinality
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.labels(
+            request.method,
+            route.path if route is not None else "unmatched",
+            str(status_code)
+        ).observe(time.perf_counter() - start_time)
+
+# Added last so it is the outermost middleware: oversized uploads are rejected before anything reads the body
+app.add_middleware(RequestSizeLimitMiddleware, max_body_size=env_config.MAX_REQUEST_SIZE_BYTES, paths=["/api/summarize"])
+
 app.include_router(logs_router, prefix="/api", tags=["Logs"])
 app.include_router(summaries_router, prefix="/api", tags=["Summaries"])
-app.include_router(healthcheck_router, prefix="/api", tags=["Healthcheck"])
\ No newline at end of file
+app.include_router(healthcheck_router, prefix="/api", tags=["Healthcheck"])
+app.include_router(metrics_router, prefix="/api", tags=["Metrics"])
\ No newline at end of file
@@ -0,0 +1,21 @@
+import pymongo
+from datetime import datetime
+from typing import Optional
+from beanie import Document, Indexed
+
+
+class CVTextCache(Document):
+    cache_key: Indexed(str, unique=True)
+    text: str
+    created_at: datetime
+    expires_at: Optional[datetime] = None
+
+    class Settings:
+        # The TTL is stored on each entry, so changing EXTRACTION_CACHE_TTL_SECONDS doesn't change the index options
+        indexes = [
+            pymongo.IndexModel(
+                [("expires_at", pymongo.ASCENDING)],
+                name="expires_at_ttl",
+                expireAfterSeconds=0
+            ),
+        ]
@@ -1,10 +1,12 @@
 import pymongo
 from pydantic import Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from beanie import Document, Indexed
 
 from schemas.summarization_schemas import SummaryResponse, CVsAnalysisResponse
+from schemas.metrics_schemas import ProcessingMetricsSchema
+from schemas.log_schemas import ProgressSchema, PartialSummarySchema
 from models.process_status_enum import ProcessStatusEnum
 
 class CVsAnalysisLogs(Document):
@@ -16,8 +18,16 @@ class CVsAnalysisLogs(Document):
     query: Optional[str] = None
     result: Optional[SummaryResponse] | Optional[CVsAnalysisResponse] = None
     status: ProcessStatusEnum
+    metrics: Optional[ProcessingMetricsSchema] = None
+    progress: Optional[ProgressSchema] = None
+    partial_results: List[PartialSummarySchema] = Field(default_factory=list)
 
     class Settings:
+        # Keyset pagination sorts by (created_at, _id) descending, optionally filtered by user_id and/or status
         indexes = [
             [("query", pymongo.TEXT)],
+            pymongo.IndexModel([("created_at", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)], name="created_at_id"),
+            pymongo.IndexModel([("user_id", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)], name="user_created_at_id"),
+            pymongo.IndexModel([("status", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)], name="status_created_at_id"),
+            pymongo.IndexModel([("user_id", pymongo.ASCENDING), ("status", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)], name="user_status_created_at_id"),
         ]
\ No newline at end of file
@@ -0,0 +1,22 @@
+import pymongo
+from datetime import datetime
+from typing import Optional
+from beanie import Document, Indexed
+
+from schemas.summarization_schemas import Summary
+
+class CVSummaryCache(Document):
+    cache_key: Indexed(str, unique=True)
+    summary: Summary
+    created_at: datetime
+    expires_at: Optional[datetime] = None
+
+    class Settings:
+        # The TTL is stored on each entry, so changing SUMMARY_CACHE_TTL_SECONDS doesn't change the index options
+        indexes = [
+            pymongo.IndexModel(
+                [("expires_at", pymongo.ASCENDING)],
+                name="expires_at_ttl",
+                expireAfterSeconds=0
+            ),
+        ]
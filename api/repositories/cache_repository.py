@@ -0,0 +1,99 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Type
+from beanie import Document
+from pymongo.errors import BulkWriteError
+
+from services.metrics.prometheus_metrics import CACHE_LOOKUPS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class CacheRepository:
+    """
+    Shared lookups, writes and eviction of the MongoDB caches keyed by cache_key. Subclasses set the document
+    model, the field holding the cached value and the cache size and TTL.
+
+    Best effort: cache errors are logged and never fail the task using the cache.
+    """
+    cache_name: str
+    cache_model: Type[Document]
+    value_field: str
+    ttl_seconds: int
+    max_entries: int
+
+    hits: int = 0
+    misses: int = 0
+
+    @classmethod
+    async def get_many(cls, http_request_id: str, cache_keys: List[str]) -> Dict[str, Any]:
+        cache_label = cls.cache_name.upper()
+        try:
+            logger.info(f"\n{'='*80}\nRETRIEVING CACHED ENTRIES - {cache_label} CACHE REPOSITORY GET MANY\nrequest id: {http_request_id}\n{'='*80}")
+            cached_entries = await cls.cache_model.find(
+                {
+                    "cache_key": {"$in": list(set(cache_keys))}
+                }
+            ).to_list()
+            cached_values = {entry.cache_key: getattr(entry, cls.value_field) for entry in cached_entries}
+
+            hits = sum(1 for cache_key in cache_keys if cache_key in cached_values)
+            cls.hits += hits
+            cls.misses += len(cache_keys) - hits
+            CACHE_LOOKUPS.labels(cls.cache_name, "hit").inc(hits)
+            CACHE_LOOKUPS.labels(cls.cache_name, "miss").inc(len(cache_keys) - hits)
+
+            logger.info(f"\n{'='*80}\n{cache_label} CACHE: {hits} HITS / {len(cache_keys) - hits} MISSES (TOTAL {cls.hits} HITS / {cls.misses} MISSES)\nrequest id: {http_request_id}\n{'='*80}")
+            return cached_values
+
+        except Exception as e:
+            logger.error(f"\n{'='*80}\nEXCEPTION - {cache_label} CACHE GET MANY\nrequest id: {http_request_id}\n{e}\n{'='*80}")
+            return {}
+
+    @classmethod
+    async def save_many(cls, http_request_id: str, values: Dict[str, Any]) -> None:
+        cache_label = cls.cache_name.upper()
+        try:
+            logger.info(f"\n{'='*80}\nCACHING ENTRIES - {cache_label} CACHE REPOSITORY SAVE MANY\nrequest id: {http_request_id}\n{'='*80}")
+            if not values:
+                return
+
+            # The TTL is stored on each entry, so changing it doesn't change the TTL index options
+            created_at = datetime.utcnow()
+            expires_at = created_at + timedelta(seconds=cls.ttl_seconds)
+            cache_entries = [
+                cls.cache_model(**{"cache_key": cache_key, cls.value_field: value, "created_at": created_at, "expires_at": expires_at})
+                for cache_key, value in values.items()
+            ]
+
+            try:
+                await cls.cache_model.insert_many(cache_entries, ordered=False)
+            except BulkWriteError:
+                logger.warning(f"\n{'='*80}\nENTRIES ALREADY CACHED BY ANOTHER TASK - {cache_label} CACHE REPOSITORY SAVE MANY\nrequest id: {http_request_id}\n{'='*80}")
+
+            await cls.evict_oldest(http_request_id)
+
+        except Exception as e:
+            logger.error(f"\n{'='*80}\nEXCEPTION - {cache_label} CACHE SAVE MANY\nrequest id: {http_request_id}\n{e}\n{'='*80}")
+
+    @classmethod
+    async def evict_oldest(cls, http_request_id: str) -> None:
+        cache_label = cls.cache_name.upper()
+        try:
+            entries_count = await cls.cache_model.get_pymongo_collection().estimated_document_count()
+            excess = entries_count - cls.max_entries
+            if excess <= 0:
+                return
+
+            logger.info(f"\n{'='*80}\nEVICTING {excess} CACHED ENTRIES - {cache_label} CACHE REPOSITORY EVICT OLDEST\nrequest id: {http_request_id}\n{'='*80}")
+            # Sorted on the TTL index: with a fixed TTL the first to expire are the oldest
+            oldest_entries = await cls.cache_model.find().sort([("expires_at", 1)]).limit(excess).to_list()
+            await cls.cache_model.find(
+                {
+                    "_id": {"$in": [entry.id for entry in oldest_entries]}
+                }
+            ).delete()
+
+        except Exception as e:
+            logger.error(f"\n{'='*80}\nEXCEPTION - {cache_label} CACHE EVICT OLDEST\nrequest id: {http_request_id}\n{e}\n{'='*80}")
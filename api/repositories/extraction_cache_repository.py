@@ -0,0 +1,24 @@
+import hashlib
+from typing import List, Optional
+
+from core.config import env_config
+from models.extraction_cache import CVTextCache
+from repositories.cache_repository import CacheRepository
+
+
+class ExtractionCacheRepository(CacheRepository):
+    cache_name = "extraction"
+    cache_model = CVTextCache
+    value_field = "text"
+    ttl_seconds = env_config.EXTRACTION_CACHE_TTL_SECONDS
+    max_entries = env_config.EXTRACTION_CACHE_MAX_ENTRIES
+
+    @staticmethod
+    def build_cache_key(file_hashes: List[Optional[str]]) -> Optional[str]:
+        if not file_hashes or None in file_hashes:
+            return None
+
+        if len(file_hashes) == 1:
+            return file_hashes[0]
+
+        return hashlib.sha256("\x1f".join(file_hashes).encode("utf-8")).hexdigest()
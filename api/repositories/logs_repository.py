@@ -1,13 +1,51 @@
+import json
+import base64
 import logging
-from typing import Optional, List
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from typing import Optional, List, Tuple
+from pymongo import ReturnDocument
+from cachetools import TTLCache
+
+from core.config import env_config
 
 from models.logs import CVsAnalysisLogs
-from schemas.log_schemas import CreateLogSchema, UpdateLogSchema, PublicLogSchema
+from models.process_status_enum import ProcessStatusEnum
+from services.metrics.prometheus_metrics import CACHE_LOOKUPS
+from schemas.log_schemas import CreateLogSchema, UpdateLogSchema, PublicLogSchema, PartialSummarySchema, ProgressSchema, LogSummarySchema, LogStatusSchema, LogsView
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+TERMINAL_STATUSES = (ProcessStatusEnum.SUCCESS, ProcessStatusEnum.FAILED)
+
+# SUCCESS and FAILED logs are not written again, so they are served from memory (LRU bounded, with TTL).
+# LOG_CACHE_MAX_ENTRIES=0 disables the cache
+terminal_logs_cache: TTLCache = TTLCache(
+    maxsize=max(env_config.LOG_CACHE_MAX_ENTRIES, 1),
+    ttl=env_config.LOG_CACHE_TTL_SECONDS
+)
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, log_id: ObjectId) -> str:
+    cursor = {"created_at": created_at.isoformat(), "id": str(log_id)}
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        decoded_cursor = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(decoded_cursor["created_at"]), ObjectId(decoded_cursor["id"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise InvalidCursorError(f"Invalid pagination cursor: {cursor}") from e
+
+
 class LogRepository: 
     @staticmethod
     async def create(http_request_id: str, log: CreateLogSchema) -> PublicLogSchema:
@@ -27,22 +65,90 @@ class LogRepository:
     async def get_by_id(http_request_id: str, request_id: str) -> Optional[PublicLogSchema]:
         try:
             logger.info(f"\n{'='*80}\nRETRIEVING LOG DATA BY ID - LOG REPOSITORY GET BY ID\nrequest id: {http_request_id}\n{'='*80}")
-            return await CVsAnalysisLogs.find_one(CVsAnalysisLogs.request_id == request_id)
+            if env_config.LOG_CACHE_MAX_ENTRIES > 0:
+                cached_log = terminal_logs_cache.get(request_id)
+                if cached_log is not None:
+                    CACHE_LOOKUPS.labels("log", "hit").inc()
+                    return cached_log
+
+                CACHE_LOOKUPS.labels("log", "miss").inc()
+
+            log = await CVsAnalysisLogs.find_one(CVsAnalysisLogs.request_id == request_id)
+            if log is not None and log.status in TERMINAL_STATUSES and env_config.LOG_CACHE_MAX_ENTRIES > 0:
+                terminal_logs_cache[request_id] = log
+
+            return log
 
         except Exception as e:
             logger.critical(f"\n{'='*80}\nEXCEPTION - LOG GET BY ID\nrequest id: {http_request_id}\n{e}\n{'='*80}")
             raise e
 
+
+    @staticmethod
+    async def get_many_by_ids(
+        http_request_id: str,
+        request_ids: List[str],
+        include_results: bool = False
+    ) -> List[CVsAnalysisLogs | LogStatusSchema]:
+        """
+        Looks up many logs with a single $in query on the unique request_id index. Without include_results
+        only the status fields are read. The logs are returned in the order of request_ids.
+        """
+        try:
+            logger.info(f"\n{'='*80}\nRETRIEVING {len(request_ids)} LOGS BY ID - LOG REPOSITORY GET MANY BY IDS\nrequest id: {http_request_id}\n{'='*80}")
+            unique_request_ids = list(dict.fromkeys(request_ids))
+            logs_query = CVsAnalysisLogs.find({"request_id": {"$in": unique_request_ids}})
+            if not include_results:
+                logs_query = logs_query.project(LogStatusSchema)
+
+            logs = {log.request_id: log for log in await logs_query.to_list()}
+            return [logs[request_id] for request_id in unique_request_ids if request_id in logs]
+
+        except Exception as e:
+            logger.critical(f"\n{'='*80}\nEXCEPTION - LOG GET MANY BY IDS\nrequest id: {http_request_id}\n{e}\n{'='*80}")
+            raise e
     
     @staticmethod
     async def get_all_paginated(
         http_request_id: str,
-        skip: int = 0, 
-        limit: int = 50
-    ) -> List[PublicLogSchema]:
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        user_id: Optional[int] = None,
+        status: Optional[ProcessStatusEnum] = None,
+        view: LogsView = "full"
+    ) -> Tuple[List[CVsAnalysisLogs | LogSummarySchema], Optional[str]]:
+        """
+        Keyset pagination, newest first: the cursor holds the (created_at, _id) of the last log of the
+        previous page, so every page is an index range scan on the compound indexes of CVsAnalysisLogs.
+        """
         try:
-            logger.info(f"\n{'='*80}\nRETRIEVING LOG DATA PAGINATED - LOG REPOSITORY GET BY ID\nrequest id: {http_request_id}\n{'='*80}")
-            return await CVsAnalysisLogs.find().skip(skip).limit(limit).to_list()
+            logger.info(f"\n{'='*80}\nRETRIEVING LOG DATA PAGINATED - LOG REPOSITORY GET ALL PAGINATED\nrequest id: {http_request_id}\n{'='*80}")
+            filters = {}
+            if user_id is not None:
+                filters["user_id"] = user_id
+            if status is not None:
+                filters["status"] = status.value
+            if cursor is not None:
+                created_at, log_id = decode_cursor(cursor)
+                filters["$or"] = [
+                    {"created_at": {"$lt": created_at}},
+                    {"created_at": created_at, "_id": {"$lt": log_id}},
+                ]
+
+            logs_query = CVsAnalysisLogs.find(filters).sort(
+                [("created_at", -1), ("_id", -1)]
+            ).limit(limit + 1)
+            if view == "summary":
+                logs_query = logs_query.project(LogSummarySchema)
+
+            logs = await logs_query.to_list()
+
+            next_cursor = None
+            if len(logs) > limit:
+                last_log = logs[limit - 1]
+                next_cursor = encode_cursor(last_log.created_at, last_log.log_id if view == "summary" else last_log.id)
+
+            return logs[:limit], next_cursor
 
         except Exception as e:
             logger.critical(f"\n{'='*80}\nEXCEPTION - LOG GET PAGINATED\nrequest id: {http_request_id}\n{e}\n{'='*80}")
@@ -53,15 +159,20 @@ class LogRepository:
         http_request_id: str,
         query: str, 
         skip: int = 0, 
-        limit: int = 50
-    ) -> List[PublicLogSchema]:
+        limit: int = 50,
+        view: LogsView = "full"
+    ) -> List[CVsAnalysisLogs | LogSummarySchema]:
         try:
             logger.info(f"\n{'='*80}\nTEXT SEARCHING LOG DATA - LOG REPOSITORY SEARCH\nrequest id: {http_request_id}\n{'='*80}")
-            return await CVsAnalysisLogs.find(
+            logs_query = CVsAnalysisLogs.find(
                 {
                     "$text": {"$search": query}
                 }
-            ).skip(skip).limit(limit).to_list()
+            ).skip(skip).limit(limit)
+            if view == "summary":
+                logs_query = logs_query.project(LogSummarySchema)
+
+            return await logs_query.to_list()
         
         except Exception as e:
             logger.critical(f"\n{'='*80}\nEXCEPTION - LOG SEARCH\nrequest id: {http_request_id}\n{e}\n{'='*80}")
@@ -76,13 +187,92 @@ class LogRepository:
         try:
             logger.info(f"\n{'='*80}\nUPDATING LOG DATA - LOG REPOSITORY UPDATE\nrequest id: {http_request_id}\n{'='*80}")
             update_data = log_update_data.model_dump(exclude_unset=True)
+            terminal_logs_cache.pop(log.request_id, None)
 
-            for field, value in update_data.items():
-                setattr(log, field, value)
-            
-            await log.save()
+            # $set only the updated fields, so partial results pushed meanwhile by other tasks are not overwritten
+            await log.set(update_data)
             return log
 
         except Exception as e:
             logger.critical(f"\n{'='*80}\nEXCEPTION - LOG UPDATE\nrequest id: {http_request_id}\n{e}\n{'='*80}")
-            raise e
\ No newline at end of file
+            raise e
+
+    @staticmethod
+    async def update_if_pending(
+        http_request_id: str,
+        request_id: str,
+        log_update_data: UpdateLogSchema
+    ) -> bool:
+        """
+        Updates the log only while it is PENDING, so a terminal log is never written again.
+        Returns whether the log was updated.
+        """
+        try:
+            logger.info(f"\n{'='*80}\nUPDATING PENDING LOG DATA - LOG REPOSITORY UPDATE IF PENDING\nrequest id: {http_request_id}\n{'='*80}")
+            update_data = log_update_data.model_dump(exclude_unset=True)
+            update_result = await CVsAnalysisLogs.find_one(
+                CVsAnalysisLogs.request_id == request_id,
+                CVsAnalysisLogs.status == ProcessStatusEnum.PENDING
+            ).update({"$set": update_data})
+            terminal_logs_cache.pop(request_id, None)
+
+            return update_result is not None and update_result.matched_count > 0
+
+        except Exception as e:
+            logger.critical(f"\n{'='*80}\nEXCEPTION - LOG UPDATE IF PENDING\nrequest id: {http_request_id}\n{e}\n{'='*80}")
+            raise e
+
+    @staticmethod
+    async def get_status(http_request_id: str, request_id: str) -> Optional[ProcessStatusEnum]:
+        """Reads only the status of the log, None when there is no log."""
+        try:
+            logger.info(f"\n{'='*80}\nRETRIEVING LOG STATUS - LOG REPOSITORY GET STATUS\nrequest id: {http_request_id}\n{'='*80}")
+            log_status = await CVsAnalysisLogs.find_one(CVsAnalysisLogs.request_id == request_id).project(LogStatusSchema)
+            return log_status.status if log_status is not None else None
+
+        except Exception as e:
+            logger.critical(f"\n{'='*80}\nEXCEPTION - LOG GET STATUS\nrequest id: {http_request_id}\n{e}\n{'='*80}")
+            raise e
+
+    @staticmethod
+    async def start_progress(http_request_id: str, request_id: str, total: int) -> None:
+        try:
+            logger.info(f"\n{'='*80}\nSTARTING LOG PROGRESS - LOG REPOSITORY START PROGRESS\nrequest id: {http_request_id}\n{'='*80}")
+            await CVsAnalysisLogs.find_one(
+                CVsAnalysisLogs.request_id == request_id,
+                CVsAnalysisLogs.status == ProcessStatusEnum.PENDING
+            ).update(
+                {
+                    "$set": {"progress": {"total": total, "completed": 0}, "partial_results": []}
+                }
+            )
+
+        except Exception as e:
+            logger.critical(f"\n{'='*80}\nEXCEPTION - LOG START PROGRESS\nrequest id: {http_request_id}\n{e}\n{'='*80}")
+            raise e
+
+    @staticmethod
+    async def push_partial_results(http_request_id: str, request_id: str, partial_results: List[PartialSummarySchema]) -> Optional[ProgressSchema]:
+        """
+        Returns the progress after the push, read atomically with it, or None when the log is no longer PENDING.
+        Terminal logs are cached by get_by_id, so they must not change after their status is set.
+        """
+        try:
+            logger.info(f"\n{'='*80}\nPUSHING {len(partial_results)} PARTIAL RESULTS - LOG REPOSITORY PUSH PARTIAL RESULTS\nrequest id: {http_request_id}\n{'='*80}")
+            if not partial_results:
+                return None
+
+            log = await CVsAnalysisLogs.get_pymongo_collection().find_one_and_update(
+                {"request_id": request_id, "status": ProcessStatusEnum.PENDING.value},
+                {
+                    "$push": {"partial_results": {"$each": [partial_result.model_dump() for partial_result in partial_results]}},
+                    "$inc": {"progress.completed": len(partial_results)}
+                },
+                projection={"_id": 0, "progress": 1},
+                return_document=ReturnDocument.AFTER
+            )
+            return ProgressSchema(**log["progress"]) if log and log.get("progress") else None
+
+        except Exception as e:
+            logger.critical(f"\n{'='*80}\nEXCEPTION - LOG PUSH PARTIAL RESULTS\nrequest id: {http_request_id}\n{e}\n{'='*80}")
+            raise e
@@ -0,0 +1,20 @@
+import hashlib
+
+from core.config import env_config
+from models.summary_cache import CVSummaryCache
+from repositories.cache_repository import CacheRepository
+from services.llm.prompts import CV_SUMMARY_PROMPT
+
+
+class SummaryCacheRepository(CacheRepository):
+    cache_name = "summary"
+    cache_model = CVSummaryCache
+    value_field = "summary"
+    ttl_seconds = env_config.SUMMARY_CACHE_TTL_SECONDS
+    max_entries = env_config.SUMMARY_CACHE_MAX_ENTRIES
+
+    @staticmethod
+    def build_cache_key(cv_text: str) -> str:
+        normalized_text = " ".join(cv_text.split())
+        cache_key_source = "\x1f".join([normalized_text, CV_SUMMARY_PROMPT, env_config.LLM_MODEL])
+        return hashlib.sha256(cache_key_source.encode("utf-8")).hexdigest()
@@ -2,13 +2,17 @@ import logging
 from datetime import datetime
 from typing import List, Optional
 from starlette.requests import Request
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends, status as http_status
 
 from models.logs import CVsAnalysisLogs
 from worker.summarize import summarize_cv
 from schemas.log_schemas import CreateLogSchema, PublicLogSchema
 from repositories.logs_repository import LogRepository
 from models.process_status_enum import ProcessStatusEnum
+from schemas.staging_schemas import StagedFileSchema
+from services.storage.uploads import UploadTooLargeError, stream_upload_to_blob_store
+from services.storage.blob_store import BlobStore, get_blob_store, build_blob_key
+from services.metrics.prometheus_metrics import UPLOAD_BYTES
 
 summaries_router = APIRouter()
 logging.basicConfig(level=logging.INFO)
@@ -51,27 +55,32 @@ async def summarize_cvs(
 
     try: 
         log_repository: LogRepository = LogRepository()
-        temp_file_storage = "/tmp/"
-        pdf_filepaths = []
-        image_filepaths = []
+        blob_store: BlobStore = get_blob_store()
+        staged_files: List[StagedFileSchema] = []
         request_id = request.state.request_id
 
         logger.info(f"\n{'='*80}\nRECEIVING REQUEST - SUMMARIZATION ROUTE SUMMARIZE_CVS\nrequest id: {request_id}\n{'='*80}")
 
         logger.info(f"\n{'='*80}\nCREATING FILES - SUMMARIZATION ROUTE SUMMARIZE_CVS\nrequest id: {request_id}\n{'='*80}")
         for file in files:
-            with open(f"{temp_file_storage}{file.filename}", "wb") as buffer:
-                if  file.content_type != "application/pdf" \
-                and file.content_type != "image/jpg" \
-                and file.content_type != "image/jpeg" \
-                and file.content_type != "image/png":
-                    logger.warning(f"\n{'='*80}\nFILE TYPE: {file.content_type} NOT SUPPORTED \n{file} WILL NOT BE PROCESSED \nSUMMARIZATION ROUTE SUMMARIZE_CVS\nrequest id: {request_id}\n{'='*80}")
-                
-                buffer.write(await file.read())
-                if file.content_type == "application/pdf":
-                    pdf_filepaths.append(f"{temp_file_storage}{file.filename}")
-                elif file.content_type == "image/jpg" or file.content_type == "image/jpeg" or file.content_type == "image/png":
-                    image_filepaths.append(f"{temp_file_storage}{file.filename}")
+            if  file.content_type != "application/pdf" \
+            and file.content_type != "image/jpg" \
+            and file.content_type != "image/jpeg" \
+            and file.content_type != "image/png":
+                logger.warning(f"\n{'='*80}\nFILE TYPE: {file.content_type} NOT SUPPORTED \n{file} WILL NOT BE PROCESSED \nSUMMARIZATION ROUTE SUMMARIZE_CVS\nrequest id: {request_id}\n{'='*80}")
+                continue
+
+            blob_key = build_blob_key(request_id, file.content_type)
+            file_hash, file_size = await stream_upload_to_blob_store(file, blob_store, blob_key)
+            UPLOAD_BYTES.inc(file_size)
+
+            staged_files.append(StagedFileSchema(
+                blob_key=blob_key,
+                original_filename=file.filename or "",
+                content_type=file.content_type,
+                sha256=file_hash,
+                size=file_size
+            ))
 
 
         logger.info(f"\n{'='*80}\nSAVING INITIAL LOG - SUMMARIZATION ROUTE SUMMARIZE_CVS\nrequest id: {request_id}\n{'='*80}")
@@ -88,10 +97,18 @@ async def summarize_cvs(
         log_result: CVsAnalysisLogs = await log_repository.create(request_id, log)
 
         logger.info(f"\n{'='*80}\nSENDING TASK TO WORKER - SUMMARIZATION ROUTE SUMMARIZE_CVS\nrequest id: {request_id}\n{'='*80}")
-        summarize_cv.delay(request_id, pdf_filepaths, image_filepaths, query)
+        summarize_cv.delay(request_id, [staged_file.model_dump() for staged_file in staged_files], query)
 
         return log_result
 
+    except UploadTooLargeError as e:
+        logger.warning(f"\n{'='*80}\nUPLOAD TOO LARGE - SUMMARIZATION ROUTE SUMMARIZE_CVS\nrequest id: {request_id}\n{e}\n{'='*80}")
+        await get_blob_store().delete_prefix(request_id)
+
+        raise HTTPException(status_code=http_status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+
     except Exception as e:
         logger.critical(f"\n{'='*80}\nEXCEPTION - SUMMARIZATION ROUTE SUMMARIZE_CVS\nrequest id: {request_id}\n{e}\n{'='*80}")
+        await get_blob_store().delete_prefix(request_id)
+
         raise HTTPException(status_code=500, detail=f"There was an error during CV Summarization. Error message: {e}")
\ No newline at end of file
@@ -1,19 +1,32 @@
+import asyncio
+import hashlib
 import logging
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Union
 from starlette.requests import Request
-from fastapi import APIRouter, HTTPException, status as http_status, Form
+from fastapi import APIRouter, HTTPException, status as http_status, Form, Query, Header, Response
+from fastapi.responses import StreamingResponse
+
+from core.config import env_config
 
 from core.database import MongoDBManager
-from repositories.logs_repository import LogRepository
+from models.logs import CVsAnalysisLogs
+from repositories.logs_repository import LogRepository, InvalidCursorError
 from models.process_status_enum import ProcessStatusEnum
-from schemas.log_schemas import PublicLogSchema, CreateLogSchema
+from services.notifications.log_events import log_events_hub
+from schemas.log_schemas import PublicLogSchema, CreateLogSchema, PaginatedLogsSchema, PaginatedLogSummariesSchema, LogSummarySchema, LogsView, BatchLogsRequestSchema, BatchLogsSchema, BatchLogStatusesSchema, LogStatusSchema, LogEventSchema
 from schemas.summarization_schemas import SummaryResponse, CVsAnalysisResponse
 
 logs_router = APIRouter()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def build_log_list_items(logs: List[CVsAnalysisLogs | LogSummarySchema], view: LogsView) -> List[PublicLogSchema] | List[LogSummarySchema]:
+    # The schema is picked from the view: left to FastAPI, a union would validate whole logs as summaries
+    if view == "summary":
+        return [LogSummarySchema.model_validate(log, from_attributes=True) for log in logs]
+    return [PublicLogSchema.model_validate(log, from_attributes=True) for log in logs]
+
 @logs_router.post("/logs")
 async def create_log(
     request: Request,
@@ -113,49 +126,139 @@ async def create_log(
         logger.critical(f"\n{'='*80}\nEXCEPTION - LOG ROUTE CREATE\nrequest id: {request_id}\n{e}\n{'='*80}")
         raise HTTPException(status_code=500, detail=f"There was an error during Log creation. Error message: {e}")
 
-@logs_router.get("/logs/paginated")
-async def get_all_logs_paginated(request: Request, skip: int = 0, limit: int = 10) -> List[PublicLogSchema]:
+@logs_router.get("/logs/paginated", response_model=None, responses={200: {"model": Union[PaginatedLogsSchema, PaginatedLogSummariesSchema]}})
+async def get_all_logs_paginated(
+    request: Request,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    user_id: Optional[int] = None,
+    status: Optional[ProcessStatusEnum] = None,
+    view: LogsView = "full"
+) -> PaginatedLogsSchema | PaginatedLogSummariesSchema:
     """
-    Route for retrieving CVs logs paginated by skip. 
+    Route for retrieving CVs logs paginated by cursor, newest first. 
 
     Input:
 
-    - skip: int - Number of entries skipped before returning the page.
-    - limit: int - Page limit of entries.
+    - limit: int - Page limit of entries (max 100).
+    - cursor: Optional[str] - next_cursor returned by the previous page. Not sending it returns the first page.
+    - user_id: Optional[int] - Only logs of this user.
+    - status: Optional[str] - Only logs with this status (PENDING, FAILED or SUCCESS).
+    - view: str - "full" returns the whole logs. "summary" returns only metadata (without result, metrics and partial results)
+      plus result_count and top_score, computed by MongoDB. Full results can then be fetched by request_id.
     
 
     Return value:  
-    [  
-        {  
-            "created_at": "YYYY-MM-DDTMM:MM:SS.mmZ",  
-            "updated_at": None,  
-            "request_id": "string",  
-            "user_id": 0,  
-            "timestamp": "YYYY-MM-DDTMM:MM:SS.mmZ",  
-            "query": "string",  
-            "result": {  
-                SummaryResponse | CVsAnalysisResponse
-            },  
-            "status": "PENDING"  
-        }  
-    ]
+    {  
+        "items": [  
+            {  
+                "created_at": "YYYY-MM-DDTMM:MM:SS.mmZ",  
+                "updated_at": None,  
+                "request_id": "string",  
+                "user_id": 0,  
+                "timestamp": "YYYY-MM-DDTMM:MM:SS.mmZ",  
+                "query": "string",  
+                "result": {  
+                    SummaryResponse | CVsAnalysisResponse
+                },  
+                "status": "PENDING"  
+            }  
+        ],  
+        "next_cursor": "string | None"  
+    }
     """
 
     try:
         logger.info(f"\n{'='*80}\nRETRIEVING LOG DATA PAGINATED - LOG ROUTE GET ALL PAGINATED\nrequest id: {request.state.request_id}\n{'='*80}")
-        return await LogRepository.get_all_paginated(request.state.request_id, skip, limit)
+        logs, next_cursor = await LogRepository.get_all_paginated(request.state.request_id, limit, cursor, user_id, status, view)
+        items = build_log_list_items(logs, view)
+        if view == "summary":
+            return PaginatedLogSummariesSchema(items=items, next_cursor=next_cursor)
+        return PaginatedLogsSchema(items=items, next_cursor=next_cursor)
+    except InvalidCursorError as e:
+        logger.warning(f"\n{'='*80}\nINVALID CURSOR - LOG ROUTE GET ALL PAGINATED\nrequest id: {request.state.request_id}\n{e}\n{'='*80}")
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.critical(f"\n{'='*80}\nEXCEPTION - LOG ROUTE GET ALL PAGINATED\nrequest id: {request.state.request_id}\n{e}\n{'='*80}")
         raise HTTPException(status_code=500, detail=f"There was an error during Log paginated retrieval. Error message: {e}")
 
+@logs_router.post("/logs/batch", response_model=None, responses={200: {"model": Union[BatchLogStatusesSchema, BatchLogsSchema]}})
+async def get_logs_batch(request: Request, batch_request: BatchLogsRequestSchema) -> BatchLogStatusesSchema | BatchLogsSchema:
+    """
+    Route for retrieving many logs of CVs at once, in a single database query. Meant for polling many requests.
+
+    Input:
+
+    - request_ids: List[str] - Request Ids of the requests that created the logs (max 500).
+    - include_results: bool - false returns only the status of each log, true returns the whole logs.
+
+    
+    Return value:  
+    {  
+        "items": [  
+            {  
+                "request_id": "string",  
+                "status": "PENDING",  
+                "updated_at": None,  
+                "progress": {  
+                    "total": 0,  
+                    "completed": 0  
+                }  
+            }  
+        ],  
+        "not_found": ["string"]  
+    }  
+    """
+
+    try:
+        logger.info(f"\n{'='*80}\nRETRIEVING LOG DATA BATCH - LOG ROUTE GET LOGS BATCH\nrequest id: {request.state.request_id}\n{'='*80}")
+        logs = await LogRepository.get_many_by_ids(request.state.request_id, batch_request.request_ids, batch_request.include_results)
+
+        found_request_ids = {log.request_id for log in logs}
+        not_found = [request_id for request_id in dict.fromkeys(batch_request.request_ids) if request_id not in found_request_ids]
+        # The schema is picked from include_results, as in build_log_list_items
+        if batch_request.include_results:
+            return BatchLogsSchema(items=[PublicLogSchema.model_validate(log, from_attributes=True) for log in logs], not_found=not_found)
+        return BatchLogStatusesSchema(items=[LogStatusSchema.model_validate(log, from_attributes=True) for log in logs], not_found=not_found)
+    except Exception as e:
+        logger.critical(f"\n{'='*80}\nEXCEPTION - LOG ROUTE GET LOGS BATCH\nrequest id: {request.state.request_id}\n{e}\n{'='*80}")
+        raise HTTPException(status_code=500, detail=f"There was an error during Log batch retrieval. Error message: {e}")
+
+def build_log_etag(log_entry: CVsAnalysisLogs) -> str:
+    # Every log write changes one of these fields, so the body is not serialized just to be hashed
+    progress = log_entry.progress
+    version = (
+        log_entry.request_id,
+        log_entry.status.value,
+        log_entry.updated_at.isoformat() if log_entry.updated_at else None,
+        (progress.total, progress.completed) if progress else None,
+        len(log_entry.partial_results)
+    )
+    return f'"{hashlib.sha256(repr(version).encode("utf-8")).hexdigest()[:32]}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if if_none_match is None:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
 @logs_router.get("/logs/{request_id}")
-async def get_log_by_id(request: Request, request_id: str) -> PublicLogSchema:
+async def get_log_by_id(
+    request: Request,
+    response: Response,
+    request_id: str,
+    if_none_match: Optional[str] = Header(default=None)
+) -> Optional[PublicLogSchema]:
     """
     Route for retrieving log of CVs by request_id. 
 
     Input:
 
     - request_id: str - Request Id of the request that created the log.
+    - If-None-Match: Optional[str] (header) - ETag of a previous response. Returns 304 without body if the log has not changed.
 
     
     Return value:  
@@ -169,25 +272,137 @@ async def get_log_by_id(request: Request, request_id: str) -> PublicLogSchema:
         "result": {  
             SummaryResponse | CVsAnalysisResponse
         },  
-        "status": "PENDING"  
+        "status": "PENDING",  
+        "metrics": {  
+            ProcessingMetricsSchema: per stage durations, LLM tokens and retries, aggregated and per CV
+        }  
     }  
     """
 
     try:
         logger.info(f"\n{'='*80}\nRETRIEVING LOG DATA BY ID - LOG ROUTE GET LOG BY ID\nrequest id: {request.state.request_id}\n{'='*80}")
-        return await LogRepository.get_by_id(request.state.request_id, request_id)
+        log_entry = await LogRepository.get_by_id(request.state.request_id, request_id)
+        if log_entry is None:
+            return None
+
+        etag = build_log_etag(log_entry)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=http_status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        response.headers["ETag"] = etag
+        return log_entry
     except Exception as e:
         logger.critical(f"\n{'='*80}\nEXCEPTION - LOG ROUTE GET LOG BY ID\nrequest id: {request.state.request_id}\n{e}\n{'='*80}")
         raise HTTPException(status_code=500, detail=f"There was an error during Log retrieval by id. Error message: {e}")
 
-@logs_router.post("/logs/search/")
-async def search_entries(request: Request, query: str) -> List[PublicLogSchema]:
+def format_sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+def format_log_sse(log_entry: CVsAnalysisLogs) -> str:
+    if log_entry.status == ProcessStatusEnum.PENDING:
+        return format_sse("progress", LogEventSchema(
+            request_id=log_entry.request_id,
+            status=log_entry.status,
+            progress=log_entry.progress,
+            partial_results=log_entry.partial_results
+        ).model_dump_json())
+
+    return format_sse("result", PublicLogSchema(**log_entry.model_dump()).model_dump_json())
+
+async def stream_log_events(
+    request: Request,
+    request_id: str,
+    log_entry: CVsAnalysisLogs,
+    events: asyncio.Queue
+) -> AsyncIterator[str]:
+    try:
+        yield format_log_sse(log_entry)
+
+        while log_entry.status == ProcessStatusEnum.PENDING:
+            try:
+                event: Optional[LogEventSchema] = await asyncio.wait_for(events.get(), timeout=env_config.LOG_EVENTS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+
+                yield ": keepalive\n\n"
+                continue
+
+            if event is not None and event.status == ProcessStatusEnum.PENDING:
+                yield format_sse("progress", event.model_dump_json())
+                continue
+
+            # Final status, or events lost while the API was reconnecting to the broker: read the log again
+            log_entry = await LogRepository.get_by_id(request.state.request_id, request_id)
+            yield format_log_sse(log_entry)
+
+    finally:
+        log_events_hub.unsubscribe(request_id, events)
+
+@logs_router.get("/logs/{request_id}/events")
+async def get_log_events(request: Request, request_id: str) -> StreamingResponse:
+    """
+    Route for following a log of CVs with Server-Sent Events, instead of polling GET /logs/{request_id}.
+
+    Input:
+
+    - request_id: str - Request Id of the request that created the log.
+
+
+    Events:
+
+    - progress: sent on subscription and every time the worker advances the request, while it is PENDING.  
+    {  
+        "request_id": "string",  
+        "status": "PENDING",  
+        "progress": {  
+            "total": 0,  
+            "completed": 0  
+        },  
+        "partial_results": [PartialSummarySchema: summaries finished since the previous event, keyed by cv_id]  
+    }  
+    - result: the whole log (same body of GET /logs/{request_id}), sent once it is SUCCESS or FAILED. The stream ends after it.
+
+    Comment lines (": keepalive") are sent every LOG_EVENTS_KEEPALIVE_SECONDS while nothing happens.
+    """
+
+    try:
+        logger.info(f"\n{'='*80}\nSUBSCRIBING TO LOG EVENTS - LOG ROUTE GET LOG EVENTS\nrequest id: {request.state.request_id}\n{'='*80}")
+        # Subscribe before reading the log, so no event published in between is lost
+        events = log_events_hub.subscribe(request_id)
+        try:
+            log_entry = await LogRepository.get_by_id(request.state.request_id, request_id)
+        except Exception:
+            log_events_hub.unsubscribe(request_id, events)
+            raise
+
+        if log_entry is None:
+            log_events_hub.unsubscribe(request_id, events)
+            raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail="There is no log with this 'request_id'.")
+
+        return StreamingResponse(
+            stream_log_events(request, request_id, log_entry, events),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    except HTTPException as http_exc:
+        logger.warning(f"\n{'='*80}\nHTTP EXCEPTION - LOG ROUTE GET LOG EVENTS\nrequest id: {request.state.request_id}\n{http_exc}\n{'='*80}")
+        raise http_exc
+
+    except Exception as e:
+        logger.critical(f"\n{'='*80}\nEXCEPTION - LOG ROUTE GET LOG EVENTS\nrequest id: {request.state.request_id}\n{e}\n{'='*80}")
+        raise HTTPException(status_code=500, detail=f"There was an error during Log events subscription. Error message: {e}")
+
+@logs_router.post("/logs/search/", response_model=None, responses={200: {"model": Union[List[PublicLogSchema], List[LogSummarySchema]]}})
+async def search_entries(request: Request, query: str, view: LogsView = "full") -> List[PublicLogSchema] | List[LogSummarySchema]:
     """
     Route for retrieving CVs logs based on query attribute search. 
 
     Input:
 
     - query: str - Search string that will be searched on the query attribute on the database log entries.
+    - view: str - "full" returns the whole logs. "summary" returns only metadata plus result_count and top_score.
     
 
     Return value:  
@@ -209,7 +424,8 @@ async def search_entries(request: Request, query: str) -> List[PublicLogSchema]:
 
     try:
         logger.info(f"\n{'='*80}\nTEXT SEARCHING LOG DATA - LOG ROUTE SEARCH ENTRIES\nrequest id: {request.state.request_id}\n{'='*80}")
-        return await LogRepository.search(request.state.request_id, query)
+        logs = await LogRepository.search(request.state.request_id, query, view=view)
+        return build_log_list_items(logs, view)
     except Exception as e:
         logger.critical(f"\n{'='*80}\nEXCEPTION - LOG ROUTE SEARCH ENTRIES\nrequest id: {request.state.request_id}\n{e}\n{'='*80}")
         raise HTTPException(status_code=500, detail=f"There was an error during Log text search. Error message: {e}")
\ No newline at end of file
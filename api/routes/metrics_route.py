@@ -0,0 +1,31 @@
+import logging
+from fastapi import APIRouter, Response
+from starlette.concurrency import run_in_threadpool
+
+from worker.config import app as celery_app
+from services.metrics.prometheus_metrics import QUEUE_MESSAGES, render_metrics
+
+metrics_router = APIRouter()
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def count_queue_messages(queue_name: str) -> int:
+    with celery_app.connection_for_read() as connection:
+        return connection.default_channel.queue_declare(queue=queue_name, passive=True).message_count
+
+@metrics_router.get("/metrics")
+async def get_metrics() -> Response:
+    """
+    Route for Prometheus scraping, in the text exposition format.
+
+    Exposes the API metrics (request latency per route, uploaded bytes, MongoDB command latency) and the
+    depth of the Celery queue. The worker exposes its own metrics on WORKER_METRICS_PORT.
+    """
+    queue_name = celery_app.conf.task_default_queue
+    try:
+        QUEUE_MESSAGES.labels(queue_name).set(await run_in_threadpool(count_queue_messages, queue_name))
+    except Exception as e:
+        logger.error(f"\n{'='*80}\nFAILED TO READ QUEUE DEPTH - METRICS ROUTE GET METRICS\n{e}\n{'='*80}")
+
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
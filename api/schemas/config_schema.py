@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from typing import Literal
+from pydantic import BaseModel, Field
 
 class ConfigClass(BaseModel):
     LLM_MODEL: str
@@ -8,4 +9,43 @@ class ConfigClass(BaseModel):
     RABBITMQ_DEFAULT_HOST: str
     RABBITMQ_DEFAULT_PORT: str
     MONGODB_URL: str
-    MONGODB_DB_NAME: str
\ No newline at end of file
+    MONGODB_DB_NAME: str
+    SUMMARIZATION_FAN_OUT: bool = False
+    LLM_MAX_CONCURRENCY: int = 4
+    SUMMARY_CACHE_ENABLED: bool = True
+    SUMMARY_CACHE_TTL_SECONDS: int = 604800
+    SUMMARY_CACHE_MAX_ENTRIES: int = 10000
+    EXTRACTION_CACHE_ENABLED: bool = True
+    EXTRACTION_CACHE_TTL_SECONDS: int = 604800
+    EXTRACTION_CACHE_MAX_ENTRIES: int = 10000
+    EXTRACTION_MAX_WORKERS: int = Field(default=1, ge=1)
+    PDF_PARALLEL_EXTRACTION: bool = True
+    PDF_PARALLEL_MIN_PAGES: int = Field(default=8, ge=1)
+    MAX_UPLOAD_SIZE_BYTES: int = 20971520
+    MAX_REQUEST_SIZE_BYTES: int = 104857600
+    UPLOAD_CHUNK_SIZE_BYTES: int = 1048576
+    UPLOAD_STAGING_DIR: str = "/tmp/uploads"
+    STAGING_MAX_AGE_SECONDS: int = 86400
+    STAGING_SWEEP_INTERVAL_SECONDS: int = 3600
+    BLOB_STORE_BACKEND: Literal["local", "gridfs"] = "local"
+    GRIDFS_BUCKET_NAME: str = "cv_uploads"
+    WORKER_SCRATCH_DIR: str = "/tmp/scratch"
+    PRE_RANKING_ENABLED: bool = False
+    PRE_RANKING_TOP_K: int = Field(default=20, ge=1)
+    PRE_RANKING_MODEL: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    RANKING_CHUNK_SIZE: int = 25
+    RANKING_FINALISTS_PER_CHUNK: int = 5
+    RATE_LIMIT_ENABLED: bool = True
+    GEMINI_REQUESTS_PER_MINUTE: int = Field(default=15, ge=1)
+    GEMINI_TOKENS_PER_MINUTE: int = Field(default=1000000, ge=1)
+    WORKER_POOL: Literal["prefork", "threads", "solo"] = "threads"
+    WORKER_CONCURRENCY: int = 2
+    LLM_PROVIDER: Literal["gemini", "stub"] = "gemini"
+    LLM_STUB_LATENCY_SECONDS: float = 1.0
+    LLM_STUB_LATENCY_JITTER_SECONDS: float = 0.5
+    LLM_STUB_ERROR_RATE: float = Field(default=0.0, ge=0.0, le=1.0)
+    LLM_STUB_SEED: int = 42
+    WORKER_METRICS_PORT: int = 9808
+    LOG_EVENTS_KEEPALIVE_SECONDS: float = 15.0
+    LOG_CACHE_MAX_ENTRIES: int = 1024
+    LOG_CACHE_TTL_SECONDS: float = 300.0
@@ -1,9 +1,26 @@
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime
-from pydantic import BaseModel
+from beanie import PydanticObjectId
+from pydantic import BaseModel, ConfigDict, Field
 
 from models.process_status_enum import ProcessStatusEnum
-from schemas.summarization_schemas import SummaryResponse, CVsAnalysisResponse
+from schemas.summarization_schemas import Summary, SummaryResponse, CVsAnalysisResponse
+from schemas.metrics_schemas import ProcessingMetricsSchema
+
+class ProgressSchema(BaseModel):
+    total: int = 0
+    completed: int = 0
+
+class PartialSummarySchema(BaseModel):
+    cv_id: int = Field(description="Position of the CV on the request.")
+    summary: Summary
+
+class LogEventSchema(BaseModel):
+    """Log change published by the worker: progress while the request is pending, then its final status."""
+    request_id: str
+    status: ProcessStatusEnum
+    progress: Optional[ProgressSchema] = None
+    partial_results: List[PartialSummarySchema] = Field(default_factory=list, description="Summaries finished since the previous event.")
 
 class CreateLogSchema(BaseModel):
     created_at: datetime
@@ -18,6 +35,8 @@ class UpdateLogSchema(BaseModel):
     updated_at: datetime = datetime.utcnow()
     result: Optional[SummaryResponse] | Optional[CVsAnalysisResponse] = None
     status: ProcessStatusEnum
+    metrics: Optional[ProcessingMetricsSchema] = None
+    partial_results: Optional[List[PartialSummarySchema]] = None
 
 class PublicLogSchema(BaseModel):
     created_at: datetime
@@ -27,4 +46,68 @@ class PublicLogSchema(BaseModel):
     timestamp: datetime
     query: Optional[str] = None
     result: Optional[SummaryResponse] | Optional[CVsAnalysisResponse] = None
-    status: ProcessStatusEnum
\ No newline at end of file
+    status: ProcessStatusEnum
+    metrics: Optional[ProcessingMetricsSchema] = None
+    progress: Optional[ProgressSchema] = None
+    partial_results: List[PartialSummarySchema] = Field(default_factory=list, description="Summaries already finished while the request is pending. Emptied once the result is saved.")
+
+class LogSummarySchema(BaseModel):
+    """Log metadata for listings, read with a MongoDB projection instead of the whole result."""
+    model_config = ConfigDict(populate_by_name=True)
+
+    log_id: Optional[PydanticObjectId] = Field(default=None, alias="_id", exclude=True)
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    request_id: str
+    user_id: int
+    timestamp: datetime
+    query: Optional[str] = None
+    status: ProcessStatusEnum
+    result_count: int = Field(default=0, description="Number of CVs on the result.")
+    top_score: Optional[float] = Field(default=None, description="Best score of the result: ranking score with a query, summary score without it.")
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "created_at": 1,
+            "updated_at": 1,
+            "request_id": 1,
+            "user_id": 1,
+            "timestamp": 1,
+            "query": 1,
+            "status": 1,
+            "result_count": {"$size": {"$ifNull": ["$result.summaries", {"$ifNull": ["$result.cvs_analysis", []]}]}},
+            "top_score": {"$max": {"$ifNull": ["$result.summaries.score", "$result.cvs_analysis.ranking_score"]}},
+        }
+
+LogsView = Literal["full", "summary"]
+
+class LogStatusSchema(BaseModel):
+    """Status of a log, read with a MongoDB projection for batch polling."""
+    request_id: str
+    status: ProcessStatusEnum
+    updated_at: Optional[datetime] = None
+    progress: Optional[ProgressSchema] = None
+
+    class Settings:
+        projection = {"_id": 0, "request_id": 1, "status": 1, "updated_at": 1, "progress": 1}
+
+class BatchLogsRequestSchema(BaseModel):
+    request_ids: List[str] = Field(min_length=1, max_length=500, description="Request ids to look up, at most 500.")
+    include_results: bool = Field(default=False, description="Return the whole logs instead of their statuses.")
+
+class BatchLogsSchema(BaseModel):
+    items: List[PublicLogSchema]
+    not_found: List[str] = Field(default_factory=list, description="Requested ids without a log.")
+
+class BatchLogStatusesSchema(BaseModel):
+    items: List[LogStatusSchema]
+    not_found: List[str] = Field(default_factory=list, description="Requested ids without a log.")
+
+class PaginatedLogsSchema(BaseModel):
+    items: List[PublicLogSchema]
+    next_cursor: Optional[str] = Field(default=None, description="Opaque cursor of the next page. Empty on the last page.")
+
+class PaginatedLogSummariesSchema(BaseModel):
+    items: List[LogSummarySchema]
+    next_cursor: Optional[str] = Field(default=None, description="Opaque cursor of the next page. Empty on the last page.")
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional
+
+class CVMetricsSchema(BaseModel):
+    cv_id: int = Field(description="Position of the CV on the request, the same used on the ranking.")
+    extraction_method: Optional[Literal["pdf", "ocr", "cache"]] = None
+    extraction_seconds: Optional[float] = None
+    summary_cached: Optional[bool] = None
+    summarize_seconds: Optional[float] = None
+    llm_input_tokens: int = 0
+    llm_output_tokens: int = 0
+    llm_retries: int = 0
+
+class ProcessingMetricsSchema(BaseModel):
+    stages_seconds: Dict[str, float] = Field(default_factory=dict, description="Wall-clock time spent on each stage (fetch, extract, ocr, summarize, pre_rank, rank, db), without the time of the stages nested in it and counting once the stages running concurrently. total is the time from the request creation until the result was ready.")
+    llm_calls: int = 0
+    llm_input_tokens: int = 0
+    llm_output_tokens: int = 0
+    llm_retries: int = Field(default=0, description="LLM attempts that failed with a retryable error.")
+    cvs: List[CVMetricsSchema] = Field(default_factory=list)
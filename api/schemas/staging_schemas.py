@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+class StagedFileSchema(BaseModel):
+    blob_key: str
+    original_filename: str
+    content_type: str
+    sha256: str
+    size: int
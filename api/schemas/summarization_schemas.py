@@ -20,6 +20,7 @@ class Summary(BaseModel):
     score: float = Field(gt=0.0, le=10.0)
 
 class CVAnalysis(BaseModel):
+    cv_id: int = Field(description="Id of the analyzed CV, exactly as given on the CVs texts.")
     cv_analysis: str =  Field(description="Detailed analysis of the given CV, based on the role description.")
     why_it_fits: str = Field(description="Detailed analysis and description of why this CV fits the role description.")
     things_to_watch_out: str = Field(description="Detailed analysis and description of points in this CV to keep an eye on based on the role description.")
@@ -32,7 +33,8 @@ class SummaryAndAnalysis(BaseModel):
     weak_points: List[str]
     why_it_fits: str = Field(description="Detailed analysis and description of why this CV fits the role description.")
     things_to_watch_out: str
-    ranking_score: float = Field(gt=0.0, le=10.0)
+    ranking_score: Optional[float] = Field(default=None, gt=0.0, le=10.0, description="LLM ranking score. Empty when the CV was left out of the LLM ranking by the pre-ranking.")
+    similarity_score: Optional[float] = Field(default=None, description="Cosine similarity between the CV summary and the query, when pre-ranking is enabled.")
 
 
 class CVsAnalysis(BaseModel):
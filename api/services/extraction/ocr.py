@@ -0,0 +1,48 @@
+import time
+import pytesseract
+from PIL import Image
+from typing import List, Tuple
+from concurrent.futures.process import BrokenProcessPool
+
+from services.extraction.process_pool import get_extraction_pool, shutdown_extraction_pool
+
+PYTESSERACT_CONFIG = '--oem 3 -l por+eng'
+
+
+def ocr_image(filepath: str) -> str:
+    try:
+        with Image.open(filepath) as image:
+            return pytesseract.image_to_string(image, config=PYTESSERACT_CONFIG)
+    # pytesseract exceptions can't be unpickled by the parent and would break the whole pool
+    except Exception as e:
+        raise RuntimeError(f"OCR failed for {filepath}: {e}") from None
+
+
+def ocr_image_timed(filepath: str) -> Tuple[str, float]:
+    start_time = time.perf_counter()
+    return ocr_image(filepath), time.perf_counter() - start_time
+
+
+def ocr_image_groups_timed(image_groups: List[List[str]]) -> Tuple[List[str], List[float]]:
+    """Returns the text of every group and the OCR time spent on each group's images."""
+    filepaths = [filepath for image_group in image_groups for filepath in image_group]
+    if not filepaths:
+        return ['' for _ in image_groups], [0.0 for _ in image_groups]
+
+    try:
+        pages = iter(list(get_extraction_pool().map(ocr_image_timed, filepaths)))
+    except BrokenProcessPool:
+        shutdown_extraction_pool()
+        raise
+
+    groups_texts, groups_seconds = [], []
+    for image_group in image_groups:
+        group_pages = [next(pages) for _ in image_group]
+        groups_texts.append('\n\n'.join(page_text for page_text, _ in group_pages))
+        groups_seconds.append(sum(seconds for _, seconds in group_pages))
+
+    return groups_texts, groups_seconds
+
+
+def ocr_image_groups(image_groups: List[List[str]]) -> List[str]:
+    return ocr_image_groups_timed(image_groups)[0]
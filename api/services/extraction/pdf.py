@@ -0,0 +1,54 @@
+import re
+from pypdf import PdfReader
+from typing import Iterator, List
+from concurrent.futures.process import BrokenProcessPool
+
+from core.config import env_config
+from services.extraction.process_pool import get_extraction_pool, shutdown_extraction_pool
+
+# A single pass is enough: '\n' is already matched by '\s'
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_page_text(page_text: str) -> str:
+    return WHITESPACE_PATTERN.sub(' ', page_text)
+
+
+def extract_pages_range(filepath: str, start: int, stop: int) -> List[str]:
+    reader = PdfReader(filepath)
+    return [normalize_page_text(reader.pages[index].extract_text()) for index in range(start, stop)]
+
+
+def iter_pdf_pages_text(reader: PdfReader) -> Iterator[str]:
+    for page in reader.pages:
+        yield normalize_page_text(page.extract_text())
+
+
+def iter_pdf_pages_text_parallel(filepath: str, pages_count: int) -> Iterator[str]:
+    chunk_size = -(-pages_count // env_config.EXTRACTION_MAX_WORKERS)
+
+    try:
+        pool = get_extraction_pool()
+        futures = [
+            pool.submit(extract_pages_range, filepath, start, min(start + chunk_size, pages_count))
+            for start in range(0, pages_count, chunk_size)
+        ]
+
+        for future in futures:
+            yield from future.result()
+
+    except BrokenProcessPool:
+        shutdown_extraction_pool()
+        raise
+
+
+def extract_pdf_text(filepath: str) -> str:
+    reader = PdfReader(filepath)
+    pages_count = len(reader.pages)
+
+    if env_config.PDF_PARALLEL_EXTRACTION and pages_count >= env_config.PDF_PARALLEL_MIN_PAGES:
+        pages_text = iter_pdf_pages_text_parallel(filepath, pages_count)
+    else:
+        pages_text = iter_pdf_pages_text(reader)
+
+    return '\n\n'.join(pages_text)
@@ -0,0 +1,50 @@
+import logging
+import threading
+import multiprocessing
+from typing import Optional
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from core.config import env_config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_extraction_pool: Optional[Executor] = None
+_extraction_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> Executor:
+    """
+    Process pool for the CPU bound extraction. Daemonic processes, such as the children of Celery's prefork pool,
+    can't start child processes, so they get a thread pool instead: OCR still runs in parallel, as tesseract is a
+    separate process, but PDF extraction is bound by the GIL. Prefer WORKER_POOL=threads or solo.
+    """
+    global _extraction_pool
+
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            if multiprocessing.current_process().daemon:
+                logger.warning(f"\n{'='*80}\nDAEMONIC PROCESS, STARTING EXTRACTION THREAD POOL WITH {env_config.EXTRACTION_MAX_WORKERS} WORKERS - PROCESS POOL GET_EXTRACTION_POOL\n{'='*80}")
+                _extraction_pool = ThreadPoolExecutor(
+                    max_workers=env_config.EXTRACTION_MAX_WORKERS,
+                    thread_name_prefix="extraction"
+                )
+            else:
+                logger.info(f"\n{'='*80}\nSTARTING EXTRACTION PROCESS POOL WITH {env_config.EXTRACTION_MAX_WORKERS} WORKERS - PROCESS POOL GET_EXTRACTION_POOL\n{'='*80}")
+                # spawn instead of fork: the worker process already holds gRPC threads from the Gemini client
+                _extraction_pool = ProcessPoolExecutor(
+                    max_workers=env_config.EXTRACTION_MAX_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+
+        return _extraction_pool
+
+
+def shutdown_extraction_pool() -> None:
+    global _extraction_pool
+
+    with _extraction_pool_lock:
+        if _extraction_pool is not None:
+            logger.info(f"\n{'='*80}\nSHUTTING DOWN EXTRACTION PROCESS POOL - PROCESS POOL SHUTDOWN_EXTRACTION_POOL\n{'='*80}")
+            _extraction_pool.shutdown(wait=True, cancel_futures=True)
+            _extraction_pool = None
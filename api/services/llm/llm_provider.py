@@ -0,0 +1,102 @@
+import time
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+from core.config import env_config
+from schemas.summarization_schemas import Summary, CVsAnalysis
+from services.metrics.request_metrics import current_cv_id, map_with_context, record_cv_metrics
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Shared by every provider instance of the process, so concurrent summarizations and
+# chord tasks running on a threaded pool never keep more than LLM_MAX_CONCURRENCY requests in flight
+llm_semaphore = threading.BoundedSemaphore(env_config.LLM_MAX_CONCURRENCY)
+
+
+class LLMProvider(ABC):
+    """
+    LLM backend used by the workers to summarize and rank CVs.
+
+    Implementations return schema-valid Summary/CVsAnalysis objects and must be safe to call from many threads.
+    """
+
+    @abstractmethod
+    def count_tokens(self, request_id: str, text: str) -> int:
+        ...
+
+    @abstractmethod
+    def summarize_cv_texts(self, request_id: str, cv_text: str) -> Summary:
+        ...
+
+    @abstractmethod
+    def rank_cvs(self, request_id: str, role_description: str, cvs: Dict[int, Summary]) -> CVsAnalysis:
+        ...
+
+    def summarize_cv_texts_measured(self, request_id: str, cv_id: int, cv_text: str) -> Summary:
+        token = current_cv_id.set(cv_id)
+        start_time = time.perf_counter()
+        try:
+            return self.summarize_cv_texts(request_id, cv_text)
+        finally:
+            record_cv_metrics(cv_id, summarize_seconds=time.perf_counter() - start_time)
+            current_cv_id.reset(token)
+
+    def summarize_cvs_texts_concurrently(
+        self,
+        request_id: str,
+        cvs_texts: List[str],
+        cv_ids: Optional[List[int]] = None,
+        on_summary: Optional[Callable[[int, Summary], None]] = None
+    ) -> List[Summary]:
+        """on_summary(cv_id, summary) is called from the executor threads as soon as each summary is ready."""
+        def summarize_and_report(cv_id: int, cv_text: str) -> Summary:
+            summary = self.summarize_cv_texts_measured(request_id, cv_id, cv_text)
+            if on_summary is not None:
+                on_summary(cv_id, summary)
+
+            return summary
+
+        try:
+            logger.info(f"\n{'='*80}\nSUMMARIZING {len(cvs_texts)} CVS CONCURRENTLY - LLM PROVIDER SUMMARIZE_CVS_TEXTS_CONCURRENTLY\nrequest id: {request_id}\n{'='*80}")
+            if not cvs_texts:
+                return []
+
+            cv_ids = cv_ids if cv_ids is not None else list(range(len(cvs_texts)))
+            with ThreadPoolExecutor(max_workers=min(env_config.LLM_MAX_CONCURRENCY, len(cvs_texts))) as executor:
+                return map_with_context(
+                    executor,
+                    lambda cv: summarize_and_report(*cv),
+                    zip(cv_ids, cvs_texts)
+                )
+        
+        except Exception as e:
+            logger.critical(f"\n{'='*80}\nEXCEPTION - LLM PROVIDER SUMMARIZE_CVS_TEXTS_CONCURRENTLY\nrequest id: {request_id}\n{e}\n{'='*80}")
+            raise e
+
+_llm_provider: Optional[LLMProvider] = None
+_llm_provider_lock = threading.Lock()
+
+
+def get_llm_provider() -> LLMProvider:
+    """
+    Process-wide provider, so clients (and the Gemini gRPC channel) are built once per worker process
+    and reused by every task.
+    """
+    global _llm_provider
+
+    with _llm_provider_lock:
+        if _llm_provider is None:
+            if env_config.LLM_PROVIDER == "stub":
+                from services.llm.stub_provider import StubLLM
+                _llm_provider = StubLLM()
+            else:
+                from services.llm.llm_summarizer import GeminiLLM
+                _llm_provider = GeminiLLM()
+
+            logger.info(f"\n{'='*80}\nUSING {type(_llm_provider).__name__.upper()} - LLM PROVIDER GET_LLM_PROVIDER\n{'='*80}")
+
+    return _llm_provider
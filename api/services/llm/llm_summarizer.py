@@ -1,19 +1,24 @@
 import logging
-from typing import List
+from typing import Dict
 from pydantic import BaseModel
 from instructor import from_gemini
 from google.generativeai import configure, GenerativeModel
 from google.generativeai.types import GenerationConfig
 
 from core.config import env_config
-from services.llm.retry import retry_strategy
+from services.llm.retry import retry_strategy, is_retryable_error
+from services.llm.llm_provider import LLMProvider, llm_semaphore
+from services.llm.rate_limiter import gemini_rate_limiter
 from schemas.summarization_schemas import Summary, CVsAnalysis
 from services.llm.prompts import CV_SUMMARY_PROMPT, CV_RANKING_PROMPT
+from services.llm.prompt_encoding import encode_summaries, estimate_tokens
+from services.metrics.request_metrics import record_llm_call, record_llm_retry
+from services.metrics.prometheus_metrics import LLM_REQUEST_SECONDS
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class GeminiLLM():
+class GeminiLLM(LLMProvider):
     def __init__(self) -> None:
         configure(api_key=env_config.GEMINI_API_KEY)
         gemini_model = GenerativeModel(
@@ -23,6 +28,7 @@ class GeminiLLM():
                 top_p=0.7,
             )
         )
+        self.gemini_model = gemini_model
         self.client = from_gemini(client=gemini_model)
         
 
@@ -30,28 +36,48 @@ class GeminiLLM():
     def llm_interaction(self, request_id: str, system_prompt: str, user_prompt: str, response_schema: BaseModel):
         try:
             logger.info(f"\n{'='*80}\nGENERATING LLM RESPONSE - GEMINI LLM LLM_INTERACTION\nrequest id: {request_id}\n{'='*80}")
-            response = self.client.messages.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_prompt
-                    },
-                    {
-                        "role": "user",
-                        "content": user_prompt
-                    },
-                ],
-                response_model=response_schema   
+            gemini_rate_limiter.acquire(request_id, estimate_tokens(system_prompt) + estimate_tokens(user_prompt))
+
+            with llm_semaphore, LLM_REQUEST_SECONDS.labels("gemini").time():
+                response, completion = self.client.messages.create_with_completion(
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": system_prompt
+                        },
+                        {
+                            "role": "user",
+                            "content": user_prompt
+                        },
+                    ],
+                    response_model=response_schema   
+                )
+
+            usage_metadata = getattr(completion, "usage_metadata", None)
+            record_llm_call(
+                getattr(usage_metadata, "prompt_token_count", 0) or 0,
+                getattr(usage_metadata, "candidates_token_count", 0) or 0
             )
 
             return response
         
         except Exception as e:
+            if is_retryable_error(e):
+                record_llm_retry()
+
             logger.critical(f"\n{'='*80}\nEXCEPTION - GEMINI LLM LLM_INTERACTION\nrequest id: {request_id}\n{e}\n{'='*80}")
             raise e
         
 
-    def summarize_cv_texts(self, request_id: str, cv_text: str):
+    def count_tokens(self, request_id: str, text: str) -> int:
+        try:
+            return self.gemini_model.count_tokens(text).total_tokens
+        
+        except Exception as e:
+            logger.critical(f"\n{'='*80}\nEXCEPTION - GEMINI LLM COUNT_TOKENS\nrequest id: {request_id}\n{e}\n{'='*80}")
+            raise e
+
+    def summarize_cv_texts(self, request_id: str, cv_text: str) -> Summary:
         try:
             logger.info(f"\n{'='*80}\nSUMMARIZING CV - GEMINI LLM SUMMARIZE_CV_TEXTS\nrequest id: {request_id}\n{'='*80}")
             return self.llm_interaction(
@@ -65,9 +91,11 @@ class GeminiLLM():
             logger.critical(f"\n{'='*80}\nEXCEPTION - GEMINI LLM SUMMARIZE_CV_TEXTS\nrequest id: {request_id}\n{e}\n{'='*80}")
             raise e
 
-    def rank_cvs(self, request_id: str, role_description: str, cvs_text: List[str]):
+    def rank_cvs(self, request_id: str, role_description: str, cvs: Dict[int, Summary]) -> CVsAnalysis:
         try:
             logger.info(f"\n{'='*80}\nRANKING CVS - GEMINI LLM RANK_CVS\nrequest id: {request_id}\n{'='*80}")
+            cvs_text = encode_summaries(cvs)
+            logger.info(f"\n{'='*80}\nRANKING PROMPT WITH {len(cvs)} CVS AND ~{estimate_tokens(cvs_text)} INPUT TOKENS - GEMINI LLM RANK_CVS\nrequest id: {request_id}\n{'='*80}")
             return self.llm_interaction(
                 request_id,
                 system_prompt=CV_RANKING_PROMPT,
@@ -77,4 +105,4 @@ class GeminiLLM():
         
         except Exception as e:
             logger.critical(f"\n{'='*80}\nEXCEPTION - GEMINI LLM RANK_CVS\nrequest id: {request_id}\n{e}\n{'='*80}")
-            raise e
\ No newline at end of file
+            raise e
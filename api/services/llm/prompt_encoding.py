@@ -0,0 +1,27 @@
+from typing import Dict
+
+from schemas.summarization_schemas import Summary
+
+# Rough ratio for Gemini tokenizers on pt-BR/en text, used when counting through the API is not wanted
+CHARS_PER_TOKEN = 4
+
+
+def compact_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def encode_summary(cv_id: int, summary: Summary) -> str:
+    return "\n".join([
+        f"CV id: {cv_id} | Score: {summary.score:g}",
+        f"Summary: {compact_text(summary.summary)}",
+        f"Strong: {'; '.join(compact_text(point) for point in summary.strong_points)}",
+        f"Weak: {'; '.join(compact_text(point) for point in summary.weak_points)}",
+    ])
+
+
+def encode_summaries(cvs: Dict[int, Summary]) -> str:
+    return "\n\n".join(encode_summary(cv_id, summary) for cv_id, summary in cvs.items())
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
@@ -37,6 +37,7 @@ So, in order to achieve your task, you'll:
 - Think carefully about how to approach this task.
 - Analyze thouroughly and carefully the role description, understanding PERFECTLY what 
 the role wants, and what is the COMPLETELY PERFECT candidate for that role
+- Each CV is identified by its "CV id". For each one of the CVs, provide its id on the cv_id field, EXACTLY as given, and never skip a CV
 - For each one of the CVs, analyze thouroughly and carefully the CV text, its summary and its strong and weak points, always keeping in mind the role description
 - Provide a detailed analysis of your cvs analysys process, MORE IMPORTANTLY what are the outcomes of your analysis, i.e. what are the most relevant candidates to the role, what you've paid attention to given the role description, and what you've been searching on the CVs given the role.
 - Provide a detailed analysis of the adherence of the CV with the given role, not losing any important information about this relationship between what the role needs and what the candidate offers
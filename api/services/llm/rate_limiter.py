@@ -0,0 +1,114 @@
+import time
+import logging
+import threading
+from typing import Optional
+from pymongo import MongoClient, ReturnDocument
+from pymongo.collection import Collection
+
+from core.config import env_config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_rate_limits_collection: Optional[Collection] = None
+_collection_lock = threading.Lock()
+
+
+def get_rate_limits_collection() -> Collection:
+    global _rate_limits_collection
+
+    with _collection_lock:
+        if _rate_limits_collection is None:
+            client = MongoClient(env_config.MONGODB_URL, serverSelectionTimeoutMS=5000, maxPoolSize=10)
+            _rate_limits_collection = client[env_config.MONGODB_DB_NAME]["llm_rate_limits"]
+
+    return _rate_limits_collection
+
+
+class TokenBucket():
+    """
+    Token bucket stored on MongoDB, so every API/worker process shares the same quota.
+
+    Refill and consumption happen in a single atomic pipeline update using the server clock ($$NOW),
+    so clock skew between workers doesn't matter.
+    """
+
+    def __init__(self, name: str, per_minute: int) -> None:
+        self.name = name
+        self.capacity = float(per_minute)
+        self.rate_per_ms = per_minute / 60000.0
+
+    def try_acquire(self, amount: float) -> float:
+        refilled_tokens = {
+            "$min": [
+                self.capacity,
+                {
+                    "$add": [
+                        {"$ifNull": ["$tokens", self.capacity]},
+                        {
+                            "$multiply": [
+                                {"$subtract": [{"$toLong": "$$NOW"}, {"$ifNull": ["$updated_at", {"$toLong": "$$NOW"}]}]},
+                                self.rate_per_ms
+                            ]
+                        }
+                    ]
+                }
+            ]
+        }
+
+        bucket = get_rate_limits_collection().find_one_and_update(
+            {"_id": self.name},
+            [
+                {"$set": {"tokens": refilled_tokens, "updated_at": {"$toLong": "$$NOW"}}},
+                {"$set": {"granted": {"$gte": ["$tokens", amount]}}},
+                {"$set": {"tokens": {"$cond": ["$granted", {"$subtract": ["$tokens", amount]}, "$tokens"]}}},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+        if bucket["granted"]:
+            return 0.0
+
+        return (amount - bucket["tokens"]) / self.rate_per_ms / 1000.0
+
+    def release(self, amount: float) -> None:
+        """Gives back tokens taken by a call that did not go through."""
+        get_rate_limits_collection().update_one(
+            {"_id": self.name},
+            [{"$set": {"tokens": {"$min": [self.capacity, {"$add": ["$tokens", amount]}]}}}]
+        )
+
+    def acquire(self, request_id: str, amount: float = 1.0) -> None:
+        amount = min(amount, self.capacity)
+
+        while (wait_seconds := self.try_acquire(amount)) > 0:
+            logger.info(f"\n{'='*80}\nRATE LIMITED ON {self.name.upper()}, WAITING {wait_seconds:.2f}s - TOKEN BUCKET ACQUIRE\nrequest id: {request_id}\n{'='*80}")
+            time.sleep(wait_seconds)
+
+
+class GeminiRateLimiter():
+    def __init__(self) -> None:
+        self.requests_bucket = TokenBucket("gemini_requests_per_minute", env_config.GEMINI_REQUESTS_PER_MINUTE)
+        self.tokens_bucket = TokenBucket("gemini_tokens_per_minute", env_config.GEMINI_TOKENS_PER_MINUTE)
+
+    def acquire(self, request_id: str, tokens: int) -> None:
+        """
+        Takes a request slot first and then the tokens of the call. When the tokens are not available the
+        request slot is given back before waiting, so a call sleeping on the TPM quota does not hold an RPM slot.
+        """
+        if not env_config.RATE_LIMIT_ENABLED:
+            return
+
+        tokens = min(tokens, self.tokens_bucket.capacity)
+        while True:
+            self.requests_bucket.acquire(request_id)
+            if (wait_seconds := self.tokens_bucket.try_acquire(tokens)) <= 0:
+                return
+
+            self.requests_bucket.release(1.0)
+            logger.info(f"\n{'='*80}\nRATE LIMITED ON {self.tokens_bucket.name.upper()}, WAITING {wait_seconds:.2f}s - GEMINI RATE LIMITER ACQUIRE\nrequest id: {request_id}\n{'='*80}")
+            time.sleep(wait_seconds)
+
+
+gemini_rate_limiter = GeminiRateLimiter()
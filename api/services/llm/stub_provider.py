@@ -0,0 +1,98 @@
+import time
+import random
+import hashlib
+import logging
+import threading
+from typing import Dict
+from google.api_core.exceptions import ServiceUnavailable
+
+from core.config import env_config
+from services.llm.retry import retry_strategy
+from services.llm.llm_provider import LLMProvider, llm_semaphore
+from services.llm.prompt_encoding import compact_text, encode_summaries, estimate_tokens
+from services.metrics.request_metrics import record_llm_call, record_llm_retry
+from services.metrics.prometheus_metrics import LLM_REQUEST_SECONDS
+from schemas.summarization_schemas import Summary, CVAnalysis, CVsAnalysis
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def stable_fraction(*parts: str) -> float:
+    digest = hashlib.sha256("\x1f".join(parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64
+
+
+def stable_score(*parts: str) -> float:
+    return round(1.0 + 9.0 * stable_fraction(*parts), 2)
+
+
+class StubLLM(LLMProvider):
+    """
+    Offline provider for load tests and benchmarks: no network and no quota.
+
+    Answers are derived from the prompt content, so the same input always gets the same Summary/CVsAnalysis.
+    Latency and transient errors (ServiceUnavailable, retried like Gemini's) are simulated with a seeded generator.
+    """
+
+    def __init__(self) -> None:
+        self.latency_seconds = env_config.LLM_STUB_LATENCY_SECONDS
+        self.latency_jitter_seconds = env_config.LLM_STUB_LATENCY_JITTER_SECONDS
+        self.error_rate = env_config.LLM_STUB_ERROR_RATE
+        self.random = random.Random(env_config.LLM_STUB_SEED)
+        self.random_lock = threading.Lock()
+
+    def simulate_call(self, request_id: str) -> None:
+        with self.random_lock:
+            latency = self.latency_seconds + self.random.uniform(0, self.latency_jitter_seconds)
+            failed = self.random.random() < self.error_rate
+
+        with llm_semaphore, LLM_REQUEST_SECONDS.labels("stub").time():
+            time.sleep(latency)
+
+        if failed:
+            record_llm_retry()
+            logger.warning(f"\n{'='*80}\nINJECTED ERROR - STUB LLM SIMULATE_CALL\nrequest id: {request_id}\n{'='*80}")
+            raise ServiceUnavailable("Injected stub LLM error")
+
+    def count_tokens(self, request_id: str, text: str) -> int:
+        return estimate_tokens(text)
+
+    @retry_strategy
+    def summarize_cv_texts(self, request_id: str, cv_text: str) -> Summary:
+        logger.info(f"\n{'='*80}\nSUMMARIZING CV - STUB LLM SUMMARIZE_CV_TEXTS\nrequest id: {request_id}\n{'='*80}")
+        self.simulate_call(request_id)
+
+        text = compact_text(cv_text)
+        words = text.split()
+        summary = Summary(
+            summary=f"Stub summary: {text[:300]}",
+            strong_points=[f"Strong point {index + 1}: {' '.join(words[index * 5:index * 5 + 5]) or 'n/a'}" for index in range(3)],
+            weak_points=[f"Weak point {index + 1}" for index in range(2)],
+            score=stable_score(text)
+        )
+        record_llm_call(estimate_tokens(cv_text), estimate_tokens(summary.model_dump_json()))
+
+        return summary
+
+    @retry_strategy
+    def rank_cvs(self, request_id: str, role_description: str, cvs: Dict[int, Summary]) -> CVsAnalysis:
+        logger.info(f"\n{'='*80}\nRANKING CVS - STUB LLM RANK_CVS\nrequest id: {request_id}\n{'='*80}")
+        self.simulate_call(request_id)
+
+        cvs_analysis = CVsAnalysis(
+            cvs_analysis=f"Stub analysis of {len(cvs)} CVs for the role: {compact_text(role_description)[:200]}",
+            summaries=[
+                CVAnalysis(
+                    cv_id=cv_id,
+                    cv_analysis=f"Stub analysis of CV {cv_id}.",
+                    why_it_fits=f"Stub fit of CV {cv_id}.",
+                    things_to_watch_out=f"Stub caveats of CV {cv_id}.",
+                    score=stable_score(role_description, summary.summary)
+                )
+                for cv_id, summary in cvs.items()
+            ]
+        )
+        record_llm_call(estimate_tokens(role_description) + estimate_tokens(encode_summaries(cvs)), estimate_tokens(cvs_analysis.model_dump_json()))
+
+        return cvs_analysis
@@ -0,0 +1,125 @@
+import os
+import logging
+from pymongo import monitoring
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Prefork workers share their values through PROMETHEUS_MULTIPROC_DIR, which must be set before startup
+MULTIPROCESS_MODE = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+LLM_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "cv_summarizer_http_request_duration_seconds",
+    "HTTP request latency per route",
+    ["method", "route", "status"]
+)
+UPLOAD_BYTES = Counter(
+    "cv_summarizer_upload_bytes_total",
+    "Bytes of CV files uploaded to the blob store"
+)
+QUEUE_MESSAGES = Gauge(
+    "cv_summarizer_queue_messages",
+    "Messages waiting on the broker queue",
+    ["queue"],
+    multiprocess_mode="liveall"
+)
+TASKS_IN_FLIGHT = Gauge(
+    "cv_summarizer_worker_tasks_in_flight",
+    "Celery tasks being executed",
+    ["task"],
+    multiprocess_mode="livesum"
+)
+TASK_SECONDS = Histogram(
+    "cv_summarizer_worker_task_duration_seconds",
+    "Celery task duration",
+    ["task", "state"],
+    buckets=LLM_BUCKETS
+)
+STAGE_SECONDS = Histogram(
+    "cv_summarizer_stage_duration_seconds",
+    "Time spent on each processing stage of a task",
+    ["stage"],
+    buckets=LLM_BUCKETS
+)
+EXTRACTION_SECONDS = Histogram(
+    "cv_summarizer_extraction_duration_seconds",
+    "Text extraction latency per CV",
+    ["method"]
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "cv_summarizer_llm_request_duration_seconds",
+    "Latency of each LLM request, retried attempts included",
+    ["provider"],
+    buckets=LLM_BUCKETS
+)
+LLM_TOKENS = Counter(
+    "cv_summarizer_llm_tokens_total",
+    "LLM tokens consumed",
+    ["direction"]
+)
+LLM_RETRIES = Counter(
+    "cv_summarizer_llm_retries_total",
+    "LLM attempts that failed with a retryable error"
+)
+CACHE_LOOKUPS = Counter(
+    "cv_summarizer_cache_lookups_total",
+    "Cache lookups, the hit ratio is hit / (hit + miss)",
+    ["cache", "result"]
+)
+MONGO_COMMAND_SECONDS = Histogram(
+    "cv_summarizer_mongo_command_duration_seconds",
+    "MongoDB command latency",
+    ["command", "outcome"]
+)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        MONGO_COMMAND_SECONDS.labels(event.command_name, "success").observe(event.duration_micros / 1e6)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        MONGO_COMMAND_SECONDS.labels(event.command_name, "failure").observe(event.duration_micros / 1e6)
+
+
+# Registered globally, so every MongoClient/AsyncIOMotorClient created afterwards reports its commands
+monitoring.register(MongoCommandMetrics())
+
+
+def build_registry() -> CollectorRegistry:
+    if not MULTIPROCESS_MODE:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics() -> tuple[bytes, str]:
+    return generate_latest(build_registry()), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int) -> None:
+    logger.info(f"\n{'='*80}\nEXPOSING METRICS ON PORT {port} - PROMETHEUS METRICS START_METRICS_SERVER\n{'='*80}")
+    start_http_server(port, registry=build_registry())
+
+
+def mark_process_dead(pid: int) -> None:
+    if MULTIPROCESS_MODE:
+        multiprocess.mark_process_dead(pid)
+
@@ -0,0 +1,201 @@
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from schemas.metrics_schemas import CVMetricsSchema, ProcessingMetricsSchema
+from services.metrics.prometheus_metrics import LLM_RETRIES, LLM_TOKENS, STAGE_SECONDS
+
+# Context variables instead of a registry keyed by request id: tasks of the same request may run
+# concurrently on one process (threads pool + fan-out) and each one must collect its own metrics
+current_request_metrics: contextvars.ContextVar[Optional["RequestMetrics"]] = contextvars.ContextVar("current_request_metrics", default=None)
+current_cv_id: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("current_cv_id", default=None)
+
+Interval = Tuple[float, float]
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+
+    return merged
+
+
+def subtract_intervals(interval: Interval, others: Iterable[Interval]) -> List[Interval]:
+    remaining: List[Interval] = []
+    start, end = interval
+    for other_start, other_end in merge_intervals(others):
+        if other_start > start:
+            remaining.append((start, min(other_start, end)))
+        start = max(start, other_end)
+        if start >= end:
+            break
+
+    if start < end:
+        remaining.append((start, end))
+
+    return remaining
+
+
+class StageFrame():
+    """A running stage, collecting the wall-clock intervals of the stages nested in it, from any thread."""
+
+    def __init__(self, stage: str, parent: Optional["StageFrame"]) -> None:
+        self.stage = stage
+        self.parent = parent
+        self.lock = threading.Lock()
+        self.nested_intervals: List[Interval] = []
+
+    def add_nested(self, interval: Interval) -> None:
+        with self.lock:
+            self.nested_intervals.append(interval)
+
+
+current_stage: contextvars.ContextVar[Optional[StageFrame]] = contextvars.ContextVar("current_stage", default=None)
+
+
+class RequestMetrics():
+    """
+    Stages are kept as wall-clock intervals (epoch seconds, comparable between the fan-out tasks) and reported
+    as the length of their union: a stage running on many threads or tasks at once is counted once.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.metrics = ProcessingMetricsSchema()
+        self.cvs: Dict[int, CVMetricsSchema] = {}
+        self.stage_intervals: Dict[str, List[Interval]] = {}
+
+    def add_stage(self, stage: str, seconds: float) -> None:
+        with self.lock:
+            self.metrics.stages_seconds[stage] = self.metrics.stages_seconds.get(stage, 0.0) + seconds
+
+    def add_stage_intervals(self, stage: str, intervals: Iterable[Interval]) -> None:
+        with self.lock:
+            self.stage_intervals.setdefault(stage, []).extend(tuple(interval) for interval in intervals)
+
+    def get_cv(self, cv_id: int) -> CVMetricsSchema:
+        if cv_id not in self.cvs:
+            self.cvs[cv_id] = CVMetricsSchema(cv_id=cv_id)
+
+        return self.cvs[cv_id]
+
+    def record_cv(self, cv_id: int, **fields: Any) -> None:
+        with self.lock:
+            cv_metrics = self.get_cv(cv_id)
+            for field, value in fields.items():
+                setattr(cv_metrics, field, value)
+
+    def record_llm_call(self, input_tokens: int, output_tokens: int, cv_id: Optional[int]) -> None:
+        with self.lock:
+            self.metrics.llm_calls += 1
+            self.metrics.llm_input_tokens += input_tokens
+            self.metrics.llm_output_tokens += output_tokens
+
+            if cv_id is not None:
+                cv_metrics = self.get_cv(cv_id)
+                cv_metrics.llm_input_tokens += input_tokens
+                cv_metrics.llm_output_tokens += output_tokens
+
+    def record_llm_retry(self, cv_id: Optional[int]) -> None:
+        with self.lock:
+            self.metrics.llm_retries += 1
+
+            if cv_id is not None:
+                self.get_cv(cv_id).llm_retries += 1
+
+    def merge(self, metrics: ProcessingMetricsSchema, stage_intervals: Optional[Dict[str, List[Interval]]] = None) -> None:
+        """Merges the metrics of another task. Its stages are merged by interval when stage_intervals is given."""
+        stage_intervals = stage_intervals or {}
+        for stage, intervals in stage_intervals.items():
+            self.add_stage_intervals(stage, intervals)
+
+        with self.lock:
+            for stage, seconds in metrics.stages_seconds.items():
+                if stage not in stage_intervals:
+                    self.metrics.stages_seconds[stage] = self.metrics.stages_seconds.get(stage, 0.0) + seconds
+
+            self.metrics.llm_calls += metrics.llm_calls
+            self.metrics.llm_input_tokens += metrics.llm_input_tokens
+            self.metrics.llm_output_tokens += metrics.llm_output_tokens
+            self.metrics.llm_retries += metrics.llm_retries
+
+            for cv_metrics in metrics.cvs:
+                self.cvs[cv_metrics.cv_id] = cv_metrics
+
+    def to_schema(self) -> ProcessingMetricsSchema:
+        with self.lock:
+            stages_seconds = dict(self.metrics.stages_seconds)
+            for stage, intervals in self.stage_intervals.items():
+                stages_seconds[stage] = stages_seconds.get(stage, 0.0) + sum(end - start for start, end in merge_intervals(intervals))
+
+            return self.metrics.model_copy(
+                update={"stages_seconds": stages_seconds, "cvs": [self.cvs[cv_id] for cv_id in sorted(self.cvs)]},
+                deep=True
+            )
+
+
+@contextmanager
+def collect_request_metrics() -> Iterator[RequestMetrics]:
+    request_metrics = RequestMetrics()
+    token = current_request_metrics.set(request_metrics)
+
+    try:
+        yield request_metrics
+    finally:
+        current_request_metrics.reset(token)
+
+
+@contextmanager
+def measure_stage(stage: str) -> Iterator[None]:
+    """
+    Measures a stage without double counting: the time of the stages nested in it (such as the partial results
+    writes made by the summarization threads) is only counted on the nested stages.
+    """
+    frame = StageFrame(stage, current_stage.get())
+    token = current_stage.set(frame)
+    start_time = time.time()
+    try:
+        yield
+    finally:
+        end_time = time.time()
+        current_stage.reset(token)
+        STAGE_SECONDS.labels(stage).observe(end_time - start_time)
+
+        if frame.parent is not None:
+            frame.parent.add_nested((start_time, end_time))
+        if (request_metrics := current_request_metrics.get()) is not None:
+            with frame.lock:
+                request_metrics.add_stage_intervals(stage, subtract_intervals((start_time, end_time), frame.nested_intervals))
+
+
+def record_cv_metrics(cv_id: int, **fields: Any) -> None:
+    if (request_metrics := current_request_metrics.get()) is not None:
+        request_metrics.record_cv(cv_id, **fields)
+
+
+def record_llm_call(input_tokens: int, output_tokens: int) -> None:
+    LLM_TOKENS.labels("input").inc(input_tokens)
+    LLM_TOKENS.labels("output").inc(output_tokens)
+    if (request_metrics := current_request_metrics.get()) is not None:
+        request_metrics.record_llm_call(input_tokens, output_tokens, current_cv_id.get())
+
+
+def record_llm_retry() -> None:
+    LLM_RETRIES.inc()
+    if (request_metrics := current_request_metrics.get()) is not None:
+        request_metrics.record_llm_retry(current_cv_id.get())
+
+
+def map_with_context(executor: Executor, function: Callable, items: Iterable) -> List:
+    """executor.map that keeps the caller's metrics context on the executor threads."""
+    items = list(items)
+    contexts = [contextvars.copy_context() for _ in items]
+
+    return list(executor.map(lambda context, item: context.run(function, item), contexts, items))
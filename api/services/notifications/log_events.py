@@ -0,0 +1,125 @@
+import socket
+import asyncio
+import logging
+import threading
+from uuid import uuid4
+from collections import defaultdict
+from typing import Dict, Optional, Set
+from kombu import Consumer, Exchange, Queue
+
+from worker.config import app as celery_app
+from schemas.log_schemas import LogEventSchema
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# MongoDB runs as a standalone server (no change streams), so the worker announces every log write on a
+# RabbitMQ fanout exchange and each API process consumes it through its own exclusive queue
+LOG_EVENTS_EXCHANGE = Exchange("cv_summarizer.log_events", type="fanout", durable=False)
+
+RECONNECT_INTERVAL_SECONDS = 5
+
+
+def publish_log_event(event: LogEventSchema) -> None:
+    # Best effort: clients that miss an event still get the log state when they (re)subscribe
+    try:
+        with celery_app.producer_or_acquire() as producer:
+            producer.publish(
+                event.model_dump(mode="json"),
+                exchange=LOG_EVENTS_EXCHANGE,
+                declare=[LOG_EVENTS_EXCHANGE],
+                serializer="json",
+                retry=True,
+                retry_policy={"max_retries": 3}
+            )
+    except Exception as e:
+        logger.error(f"\n{'='*80}\nFAILED TO PUBLISH LOG EVENT - LOG EVENTS PUBLISH_LOG_EVENT\nrequest id: {event.request_id}\n{e}\n{'='*80}")
+
+
+class LogEventsHub:
+    """
+    Fans out the log events received from the broker to the subscribers of this process. The broker is consumed
+    on a thread and the events are handed to the subscribers' asyncio queues on the API event loop.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._consume, name="log-events-hub", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=RECONNECT_INTERVAL_SECONDS)
+            self._thread = None
+
+    def subscribe(self, request_id: str) -> asyncio.Queue:
+        events: asyncio.Queue = asyncio.Queue()
+        self._subscribers[request_id].add(events)
+        return events
+
+    def unsubscribe(self, request_id: str, events: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(request_id)
+        if subscribers is None:
+            return
+
+        subscribers.discard(events)
+        if not subscribers:
+            del self._subscribers[request_id]
+
+    def _dispatch(self, event: LogEventSchema) -> None:
+        for events in self._subscribers.get(event.request_id, ()):
+            events.put_nowait(event)
+
+    def _resync(self) -> None:
+        # None tells the subscribers that events may have been lost and the log must be read again
+        for subscribers in self._subscribers.values():
+            for events in subscribers:
+                events.put_nowait(None)
+
+    def _on_message(self, body: dict, message) -> None:
+        try:
+            event = LogEventSchema(**body)
+        except Exception as e:
+            logger.error(f"\n{'='*80}\nINVALID LOG EVENT - LOG EVENTS HUB\n{e}\n{'='*80}")
+            return
+
+        self._loop.call_soon_threadsafe(self._dispatch, event)
+
+    def _consume(self) -> None:
+        reconnecting = False
+        while not self._stop_event.is_set():
+            try:
+                with celery_app.connection_for_read() as connection:
+                    queue = Queue(
+                        f"cv_summarizer.log_events.{uuid4().hex}",
+                        exchange=LOG_EVENTS_EXCHANGE,
+                        exclusive=True,
+                        auto_delete=True
+                    )
+                    with Consumer(connection, queues=[queue], callbacks=[self._on_message], accept=["json"], no_ack=True):
+                        logger.info(f"\n{'='*80}\nCONSUMING LOG EVENTS - LOG EVENTS HUB\n{'='*80}")
+                        if reconnecting:
+                            self._loop.call_soon_threadsafe(self._resync)
+                            reconnecting = False
+
+                        while not self._stop_event.is_set():
+                            try:
+                                connection.drain_events(timeout=1)
+                            except socket.timeout:
+                                pass
+
+            except Exception as e:
+                logger.error(f"\n{'='*80}\nLOG EVENTS CONSUMER DISCONNECTED - LOG EVENTS HUB\n{e}\n{'='*80}")
+                reconnecting = True
+                self._stop_event.wait(RECONNECT_INTERVAL_SECONDS)
+
+
+log_events_hub = LogEventsHub()
@@ -0,0 +1,60 @@
+import logging
+import threading
+import numpy as np
+from typing import List, Optional
+
+from core.config import env_config
+from schemas.summarization_schemas import Summary
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def summary_to_text(summary: Summary) -> str:
+    return "\n".join([summary.summary, *summary.strong_points, *summary.weak_points])
+
+
+def cosine_similarities(query_embedding: np.ndarray, documents_embeddings: np.ndarray) -> np.ndarray:
+    query_norm = np.linalg.norm(query_embedding)
+    documents_norms = np.linalg.norm(documents_embeddings, axis=1)
+    denominators = np.maximum(documents_norms * query_norm, np.finfo(np.float32).eps)
+
+    return (documents_embeddings @ query_embedding) / denominators
+
+
+class EmbeddingPreRanker():
+    def __init__(self) -> None:
+        try:
+            from fastembed import TextEmbedding
+        except ImportError as e:
+            raise RuntimeError(
+                "PRE_RANKING_ENABLED requires the 'fastembed' package. Install it with 'pip install -r requirements.txt'."
+            ) from e
+
+        logger.info(f"\n{'='*80}\nLOADING EMBEDDING MODEL {env_config.PRE_RANKING_MODEL} - EMBEDDING PRE RANKER\n{'='*80}")
+        self.model = TextEmbedding(model_name=env_config.PRE_RANKING_MODEL)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(list(self.model.embed(texts)), dtype=np.float32)
+
+    def score(self, request_id: str, query: str, summaries: List[Summary]) -> np.ndarray:
+        logger.info(f"\n{'='*80}\nSCORING {len(summaries)} SUMMARIES AGAINST QUERY - EMBEDDING PRE RANKER SCORE\nrequest id: {request_id}\n{'='*80}")
+        embeddings = self.embed([query] + [summary_to_text(summary) for summary in summaries])
+
+        return cosine_similarities(embeddings[0], embeddings[1:])
+
+
+_pre_ranker: Optional[EmbeddingPreRanker] = None
+_pre_ranker_lock = threading.Lock()
+
+
+def get_pre_ranker() -> EmbeddingPreRanker:
+    """Process-wide pre-ranker, so the embedding model is loaded once even when tasks run on threads."""
+    global _pre_ranker
+
+    if _pre_ranker is None:
+        with _pre_ranker_lock:
+            if _pre_ranker is None:
+                _pre_ranker = EmbeddingPreRanker()
+
+    return _pre_ranker
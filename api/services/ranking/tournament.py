@@ -0,0 +1,85 @@
+import logging
+from typing import Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+from core.config import env_config
+from services.llm.llm_provider import LLMProvider
+from services.metrics.request_metrics import map_with_context
+from schemas.summarization_schemas import Summary, CVAnalysis
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def rank_chunk(
+    request_id: str,
+    llm_service: LLMProvider,
+    role_description: str,
+    cvs: Dict[int, Summary]
+) -> Tuple[str, List[CVAnalysis]]:
+    cvs_ranking = llm_service.rank_cvs(request_id, role_description, cvs)
+
+    analyses: Dict[int, CVAnalysis] = {}
+    for cv_analysis in cvs_ranking.summaries:
+        if cv_analysis.cv_id in cvs and cv_analysis.cv_id not in analyses:
+            analyses[cv_analysis.cv_id] = cv_analysis
+
+    if len(analyses) < len(cvs):
+        logger.warning(f"\n{'='*80}\nLLM RANKED {len(analyses)} OF {len(cvs)} CVS - TOURNAMENT RANK_CHUNK\nrequest id: {request_id}\n{'='*80}")
+
+    ranking = sorted(analyses.values(), key=lambda cv_analysis: cv_analysis.score, reverse=True)
+    return cvs_ranking.cvs_analysis, ranking
+
+
+def rank_cvs_tournament(
+    request_id: str,
+    llm_service: LLMProvider,
+    role_description: str,
+    cvs: Dict[int, Summary]
+) -> Tuple[str, List[CVAnalysis]]:
+    """
+    Ranks the CVs keyed by their id and returns the analysis process and the analyses, best first.
+
+    Batches bigger than RANKING_CHUNK_SIZE are split into chunks ranked concurrently. The best
+    RANKING_FINALISTS_PER_CHUNK of every chunk go to a final round, and the eliminated CVs keep
+    the analysis of their chunk and are placed after the finalists.
+    """
+    chunk_size = max(env_config.RANKING_CHUNK_SIZE, 2)
+    if len(cvs) <= chunk_size:
+        return rank_chunk(request_id, llm_service, role_description, cvs)
+
+    cv_ids = list(cvs.keys())
+    chunks = [
+        {cv_id: cvs[cv_id] for cv_id in cv_ids[start:start + chunk_size]}
+        for start in range(0, len(cv_ids), chunk_size)
+    ]
+    logger.info(f"\n{'='*80}\nRANKING {len(cvs)} CVS IN {len(chunks)} CHUNKS - TOURNAMENT RANK_CVS_TOURNAMENT\nrequest id: {request_id}\n{'='*80}")
+
+    with ThreadPoolExecutor(max_workers=min(env_config.LLM_MAX_CONCURRENCY, len(chunks))) as executor:
+        chunks_rankings = map_with_context(
+            executor,
+            lambda chunk: rank_chunk(request_id, llm_service, role_description, chunk),
+            chunks
+        )
+
+    finalists_per_chunk = max(1, min(env_config.RANKING_FINALISTS_PER_CHUNK, chunk_size - 1))
+    finalists: Dict[int, CVAnalysis] = {}
+    eliminated: List[CVAnalysis] = []
+    for _, chunk_ranking in chunks_rankings:
+        for cv_analysis in chunk_ranking[:finalists_per_chunk]:
+            finalists[cv_analysis.cv_id] = cv_analysis
+        eliminated.extend(chunk_ranking[finalists_per_chunk:])
+
+    cvs_analysis_process, finalists_ranking = rank_cvs_tournament(
+        request_id,
+        llm_service,
+        role_description,
+        {cv_id: cvs[cv_id] for cv_id in finalists}
+    )
+
+    # Finalists dropped by the LLM on the final round keep the analysis of their chunk
+    ranked_finalists = {cv_analysis.cv_id for cv_analysis in finalists_ranking}
+    eliminated.extend(cv_analysis for cv_id, cv_analysis in finalists.items() if cv_id not in ranked_finalists)
+    eliminated.sort(key=lambda cv_analysis: cv_analysis.score, reverse=True)
+
+    return cvs_analysis_process, finalists_ranking + eliminated
@@ -0,0 +1,230 @@
+import os
+import time
+import shutil
+import logging
+import mimetypes
+from uuid import uuid4
+from datetime import datetime, timedelta
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Optional
+from starlette.concurrency import run_in_threadpool
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+
+from core.config import env_config
+from core.database import MongoDBManager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def build_blob_key(request_id: str, content_type: str) -> str:
+    extension = mimetypes.guess_extension(content_type) or ""
+    return f"{request_id}/{uuid4().hex}{extension}"
+
+
+def remove_expired_dirs(root_dir: str, max_age_seconds: int) -> int:
+    if not os.path.isdir(root_dir):
+        return 0
+
+    removed_dirs = 0
+    expiration = time.time() - max_age_seconds
+
+    with os.scandir(root_dir) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False) and entry.stat(follow_symlinks=False).st_mtime < expiration:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                    removed_dirs += 1
+            except FileNotFoundError:
+                continue
+
+    return removed_dirs
+
+
+class BlobStore(ABC):
+    """
+    Storage shared by the API and the workers for the uploaded CV files.
+
+    Blob keys are "<request_id>/<generated name>", so every file of a request can be removed by its prefix.
+    """
+
+    @abstractmethod
+    async def put(self, blob_key: str, chunks: AsyncIterator[bytes]) -> None:
+        ...
+
+    @abstractmethod
+    async def fetch_to_local(self, blob_key: str) -> str:
+        """Returns a local filepath with the blob content, so it can be read by pypdf/tesseract."""
+        ...
+
+    @abstractmethod
+    async def release_local(self, blob_key: str, local_path: str) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, blob_key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str) -> None:
+        ...
+
+    @abstractmethod
+    async def sweep_expired(self) -> int:
+        ...
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root_dir: str) -> None:
+        self.root_dir = root_dir
+
+    def _path(self, blob_key: str) -> str:
+        return os.path.join(self.root_dir, blob_key)
+
+    async def put(self, blob_key: str, chunks: AsyncIterator[bytes]) -> None:
+        filepath = self._path(blob_key)
+        await run_in_threadpool(os.makedirs, os.path.dirname(filepath), exist_ok=True)
+
+        buffer = await run_in_threadpool(open, filepath, "wb")
+        try:
+            async for chunk in chunks:
+                await run_in_threadpool(buffer.write, chunk)
+        except Exception:
+            await run_in_threadpool(buffer.close)
+            await run_in_threadpool(os.remove, filepath)
+            raise
+
+        await run_in_threadpool(buffer.close)
+
+    async def fetch_to_local(self, blob_key: str) -> str:
+        return self._path(blob_key)
+
+    async def release_local(self, blob_key: str, local_path: str) -> None:
+        return None
+
+    async def delete(self, blob_key: str) -> None:
+        try:
+            await run_in_threadpool(os.remove, self._path(blob_key))
+        except FileNotFoundError:
+            pass
+
+    async def delete_prefix(self, prefix: str) -> None:
+        await run_in_threadpool(shutil.rmtree, self._path(prefix), ignore_errors=True)
+
+    async def sweep_expired(self) -> int:
+        return await run_in_threadpool(remove_expired_dirs, self.root_dir, env_config.STAGING_MAX_AGE_SECONDS)
+
+
+class GridFSBlobStore(BlobStore):
+    def __init__(self, bucket_name: str, scratch_dir: str) -> None:
+        self.bucket_name = bucket_name
+        self.scratch_dir = scratch_dir
+        self._prefix_index_created = False
+        self._scratch_swept_at: Optional[float] = None
+
+    def _bucket(self) -> AsyncIOMotorGridFSBucket:
+        return AsyncIOMotorGridFSBucket(MongoDBManager.get_db_instance().get_db(), bucket_name=self.bucket_name)
+
+    async def _ensure_prefix_index(self) -> None:
+        # GridFS only indexes filename/uploadDate, so delete_prefix would scan every stored file without it
+        if self._prefix_index_created:
+            return
+
+        files_collection = MongoDBManager.get_db_instance().get_db()[f"{self.bucket_name}.files"]
+        await files_collection.create_index("metadata.prefix", name="metadata_prefix")
+        self._prefix_index_created = True
+
+    async def put(self, blob_key: str, chunks: AsyncIterator[bytes]) -> None:
+        await self._ensure_prefix_index()
+        grid_in = self._bucket().open_upload_stream(
+            blob_key,
+            metadata={"prefix": blob_key.split("/", 1)[0]}
+        )
+        try:
+            async for chunk in chunks:
+                await grid_in.write(chunk)
+        except Exception:
+            await grid_in.abort()
+            raise
+
+        await grid_in.close()
+
+    async def _sweep_scratch_dir(self) -> None:
+        # The scratch dir lives on the worker, out of reach of the API sweep, so the files that release_local
+        # missed (e.g. a worker crash mid-fetch) are removed from here
+        if self._scratch_swept_at is not None and time.monotonic() - self._scratch_swept_at < env_config.STAGING_SWEEP_INTERVAL_SECONDS:
+            return
+
+        self._scratch_swept_at = time.monotonic()
+        removed_dirs = await run_in_threadpool(remove_expired_dirs, self.scratch_dir, env_config.STAGING_MAX_AGE_SECONDS)
+        if removed_dirs:
+            logger.info(f"\n{'='*80}\nREMOVED {removed_dirs} EXPIRED SCRATCH DIRS - GRIDFS BLOB STORE SWEEP SCRATCH DIR\n{'='*80}")
+
+    async def fetch_to_local(self, blob_key: str) -> str:
+        await self._sweep_scratch_dir()
+        local_path = os.path.join(self.scratch_dir, blob_key)
+        await run_in_threadpool(os.makedirs, os.path.dirname(local_path), exist_ok=True)
+
+        # Disk writes go to the threadpool, so they don't block the worker event loop shared by the other tasks
+        grid_out = await self._bucket().open_download_stream_by_name(blob_key)
+        destination = await run_in_threadpool(open, local_path, "wb")
+        try:
+            while chunk := await grid_out.readchunk():
+                await run_in_threadpool(destination.write, chunk)
+        except Exception:
+            await run_in_threadpool(destination.close)
+            await self.release_local(blob_key, local_path)
+            raise
+
+        await run_in_threadpool(destination.close)
+        return local_path
+
+    async def release_local(self, blob_key: str, local_path: str) -> None:
+        try:
+            await run_in_threadpool(os.remove, local_path)
+        except FileNotFoundError:
+            pass
+
+    async def delete(self, blob_key: str) -> None:
+        bucket = self._bucket()
+        async for grid_out in bucket.find({"filename": blob_key}):
+            await bucket.delete(grid_out._id)
+
+        await self.release_local(blob_key, os.path.join(self.scratch_dir, blob_key))
+
+    async def delete_prefix(self, prefix: str) -> None:
+        await self._ensure_prefix_index()
+        bucket = self._bucket()
+        async for grid_out in bucket.find({"metadata.prefix": prefix}):
+            await bucket.delete(grid_out._id)
+
+        await run_in_threadpool(shutil.rmtree, os.path.join(self.scratch_dir, prefix), ignore_errors=True)
+
+    async def sweep_expired(self) -> int:
+        bucket = self._bucket()
+        expiration = datetime.utcnow() - timedelta(seconds=env_config.STAGING_MAX_AGE_SECONDS)
+
+        removed_blobs = 0
+        async for grid_out in bucket.find({"uploadDate": {"$lt": expiration}}):
+            await bucket.delete(grid_out._id)
+            removed_blobs += 1
+
+        await run_in_threadpool(remove_expired_dirs, self.scratch_dir, env_config.STAGING_MAX_AGE_SECONDS)
+        return removed_blobs
+
+
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    global _blob_store
+
+    if _blob_store is None:
+        if env_config.BLOB_STORE_BACKEND == "gridfs":
+            _blob_store = GridFSBlobStore(env_config.GRIDFS_BUCKET_NAME, env_config.WORKER_SCRATCH_DIR)
+        else:
+            _blob_store = LocalBlobStore(env_config.UPLOAD_STAGING_DIR)
+
+        logger.info(f"\n{'='*80}\nUSING {type(_blob_store).__name__.upper()} - BLOB STORE GET_BLOB_STORE\n{'='*80}")
+
+    return _blob_store
@@ -0,0 +1,93 @@
+import hashlib
+from typing import AsyncIterator, Iterable, Tuple
+from fastapi import UploadFile, status as http_status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import env_config
+from services.storage.blob_store import BlobStore
+
+
+class UploadTooLargeError(Exception):
+    pass
+
+
+class RequestSizeLimitMiddleware:
+    """
+    Rejects upload requests bigger than max_body_size before the multipart body is parsed: Starlette spools the
+    whole body while parsing, so the per file limit of stream_upload_to_blob_store is only checked afterwards.
+
+    Requests with Content-Length are rejected without reading the body, the others are cut once they exceed it.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int, paths: Iterable[str]) -> None:
+        self.app = app
+        self.max_body_size = max_body_size
+        self.paths = set(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request exceeds the maximum size of {self.max_body_size} bytes"
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_body_size:
+            response = JSONResponse({"detail": detail}, status_code=http_status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            await response(scope, receive, send)
+            return
+
+        received_bytes = 0
+        exceeded = False
+
+        async def receive_limited() -> Message:
+            nonlocal received_bytes, exceeded
+
+            if exceeded:
+                return {"type": "http.disconnect"}
+
+            message = await receive()
+            if message["type"] == "http.request":
+                received_bytes += len(message.get("body", b""))
+                if received_bytes > self.max_body_size:
+                    # Ends the body for the app as a client disconnect, so nothing else is read or stored
+                    exceeded = True
+                    return {"type": "http.disconnect"}
+
+            return message
+
+        async def send_unless_exceeded(message: Message) -> None:
+            # The app answers the interrupted body with its own error, which is replaced by the 413 below
+            if not exceeded:
+                await send(message)
+
+        try:
+            await self.app(scope, receive_limited, send_unless_exceeded)
+        except Exception:
+            if not exceeded:
+                raise
+
+        if exceeded:
+            response = JSONResponse({"detail": detail}, status_code=http_status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            await response(scope, receive, send)
+
+
+async def stream_upload_to_blob_store(file: UploadFile, blob_store: BlobStore, blob_key: str) -> Tuple[str, int]:
+    file_hash = hashlib.sha256()
+    written_bytes = 0
+
+    async def read_chunks() -> AsyncIterator[bytes]:
+        nonlocal written_bytes
+
+        while chunk := await file.read(env_config.UPLOAD_CHUNK_SIZE_BYTES):
+            written_bytes += len(chunk)
+            if written_bytes > env_config.MAX_UPLOAD_SIZE_BYTES:
+                raise UploadTooLargeError(
+                    f"File {file.filename} exceeds the maximum upload size of {env_config.MAX_UPLOAD_SIZE_BYTES} bytes"
+                )
+
+            file_hash.update(chunk)
+            yield chunk
+
+    await blob_store.put(blob_key, read_chunks())
+    return file_hash.hexdigest(), written_bytes
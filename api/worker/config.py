@@ -1,8 +1,14 @@
 from core.config import env_config
-from core.database import MongoDBManager
+from worker.runtime import get_worker_loop, shutdown_worker_runtime
+from services.extraction.process_pool import shutdown_extraction_pool
+from services.llm.llm_provider import get_llm_provider
+from services.metrics.prometheus_metrics import TASKS_IN_FLIGHT, TASK_SECONDS, mark_process_dead, start_metrics_server
 
+import os
+import time
 import logging
 from celery import Celery
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown, worker_shutdown, task_prerun, task_postrun
 
 user = env_config.RABBITMQ_DEFAULT_USER
 password = env_config.RABBITMQ_DEFAULT_PASS
@@ -11,28 +17,64 @@ port = env_config.RABBITMQ_DEFAULT_PORT
 
 broker_url = f'amqp://{user}:{password}@{host}:{port}//'
 
+# The rpc:// backend does not support chords, so the fan-out mode stores task results on MongoDB
+result_backend = env_config.MONGODB_URL if env_config.SUMMARIZATION_FAN_OUT else 'rpc://'
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Celery(
     'worker',
     broker=broker_url,
-    backend='rpc://',
+    backend=result_backend,
     include=['worker.summarize']
 )
 
-@app.on_after_configure.connect
-def setup_db_connection(sender, **kwargs):
+# Runs on the main worker process only; prefork children share their values through PROMETHEUS_MULTIPROC_DIR
+@worker_init.connect
+def setup_metrics_server(**kwargs):
+    if env_config.WORKER_METRICS_PORT:
+        start_metrics_server(env_config.WORKER_METRICS_PORT)
+
+# Built inside each child process (after the fork), so no gRPC channel, event loop
+# or Motor client is shared between processes
+@worker_process_init.connect
+def setup_worker_process(**kwargs):
     try:
-        MongoDBManager.initialize_db()
+        get_worker_loop()
     except Exception as e:
         logger.critical(f"\n{'='*80}\nEXCEPTION\nFAILED TO INITIALIZE DATABASE IN CELERY WORKER\nWORKER CONFIG\n\n{e}\n{'='*80}")
         raise SystemExit(1) from e
 
-@app.on_after_finalize.disconnect
-def shutdown_db_connection(sender, **kwargs):
-    MongoDBManager.close_db()
+    get_llm_provider()
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    shutdown_extraction_pool()
+    shutdown_worker_runtime()
+    mark_process_dead(os.getpid())
+
+# solo and threads pools run the tasks on the main process, which lazily starts its runtime on the first task
+@worker_shutdown.connect
+def shutdown_main_process(**kwargs):
+    shutdown_extraction_pool()
+    shutdown_worker_runtime()
+
+tasks_start_times = {}
+
+@task_prerun.connect
+def record_task_start(task_id=None, task=None, **kwargs):
+    tasks_start_times[task_id] = time.perf_counter()
+    TASKS_IN_FLIGHT.labels(task.name).inc()
+
+@task_postrun.connect
+def record_task_end(task_id=None, task=None, state=None, **kwargs):
+    TASKS_IN_FLIGHT.labels(task.name).dec()
+    if (start_time := tasks_start_times.pop(task_id, None)) is not None:
+        TASK_SECONDS.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - start_time)
 
 app.conf.update(
-    result_expires=1800
+    result_expires=1800,
+    worker_pool=env_config.WORKER_POOL,
+    worker_concurrency=env_config.WORKER_CONCURRENCY
 )
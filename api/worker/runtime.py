@@ -0,0 +1,60 @@
+import os
+import asyncio
+import logging
+import threading
+from typing import Any, Coroutine, Optional
+
+from core.database import MongoDBManager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# One event loop per worker process, running on its own thread. Every coroutine of the tasks
+# (Beanie, Motor, GridFS) is submitted to it, so the Motor client is always used from the loop
+# it was created on, whatever the pool: solo, threads (many tasks at once) or prefork (one per child).
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_loop_pid: Optional[int] = None
+_runtime_lock = threading.Lock()
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _loop_thread, _loop_pid
+
+    with _runtime_lock:
+        # Threads don't survive a fork, so a loop inherited from the parent process is never reused
+        if _loop is None or _loop_pid != os.getpid():
+            logger.info(f"\n{'='*80}\nSTARTING EVENT LOOP AND DATABASE CONNECTION ON PID {os.getpid()} - WORKER RUNTIME GET_WORKER_LOOP\n{'='*80}")
+            loop = asyncio.new_event_loop()
+            loop_thread = threading.Thread(target=loop.run_forever, name="worker-event-loop", daemon=True)
+            loop_thread.start()
+
+            db_manager = MongoDBManager.get_db_instance()
+            db_manager._client = None
+            db_manager._db = None
+            asyncio.run_coroutine_threadsafe(db_manager.connect(), loop).result()
+
+            _loop, _loop_thread, _loop_pid = loop, loop_thread, os.getpid()
+
+    return _loop
+
+
+def run_async(coroutine: Coroutine) -> Any:
+    return asyncio.run_coroutine_threadsafe(coroutine, get_worker_loop()).result()
+
+
+def shutdown_worker_runtime() -> None:
+    global _loop, _loop_thread, _loop_pid
+
+    with _runtime_lock:
+        if _loop is None or _loop_pid != os.getpid():
+            return
+
+        logger.info(f"\n{'='*80}\nCLOSING EVENT LOOP AND DATABASE CONNECTION ON PID {os.getpid()} - WORKER RUNTIME SHUTDOWN_WORKER_RUNTIME\n{'='*80}")
+        try:
+            asyncio.run_coroutine_threadsafe(MongoDBManager.get_db_instance().disconnect(), _loop).result()
+        finally:
+            _loop.call_soon_threadsafe(_loop.stop)
+            _loop_thread.join()
+            _loop.close()
+            _loop, _loop_thread, _loop_pid = None, None, None
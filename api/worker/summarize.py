@@ -1,22 +1,30 @@
 from worker.config import app
-from core.database import MongoDBManager
-from services.llm.llm_summarizer import GeminiLLM
+from worker.runtime import run_async
+from core.config import env_config
+from services.llm.llm_provider import LLMProvider, get_llm_provider
+from services.extraction.ocr import ocr_image_groups_timed
+from services.ranking.pre_ranker import get_pre_ranker
+from services.ranking.tournament import rank_cvs_tournament
+from services.extraction.pdf import extract_pdf_text as extract_pdf_pages_text
+from services.storage.blob_store import BlobStore, get_blob_store
+from services.metrics.request_metrics import RequestMetrics, collect_request_metrics, measure_stage, record_cv_metrics
+from services.metrics.prometheus_metrics import EXTRACTION_SECONDS
+from services.notifications.log_events import publish_log_event
 from repositories.logs_repository import LogRepository
+from repositories.summary_cache_repository import SummaryCacheRepository
+from repositories.extraction_cache_repository import ExtractionCacheRepository
 from models.logs import CVsAnalysisLogs
 from models.process_status_enum import ProcessStatusEnum
-from schemas.log_schemas import UpdateLogSchema
-from schemas.summarization_schemas import Summary, CVsAnalysis, SummaryResponse, CVsAnalysisResponse, SummaryAndAnalysis
+from schemas.log_schemas import UpdateLogSchema, PartialSummarySchema, ProgressSchema, LogEventSchema
+from schemas.staging_schemas import StagedFileSchema
+from schemas.metrics_schemas import ProcessingMetricsSchema
+from schemas.summarization_schemas import Summary, SummaryResponse, CVsAnalysisResponse, SummaryAndAnalysis
 
-import re
-import os
 import time
-import asyncio
 import logging
-import pytesseract
-from PIL import Image
-from pypdf import PdfReader
+from celery import chord
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -24,172 +32,512 @@ logger = logging.getLogger(__name__)
 def extract_pdf_text(request_id:str, file: str) -> str | None:
     logger.info(f"\n{'='*80}\nEXTRACTING PDFS TEXT - WORKER EXTRACT_PDF_TEXT\nrequest id: {request_id}\n{'='*80}")
     try:
-        reader = PdfReader(file)
-
-        pages_text = []
-        for page in reader.pages:
-            page_text = page.extract_text()
-            page_text = re.sub(r'\n', ' ', page_text)
-            page_text = re.sub(r'\s+', ' ', page_text)
-            pages_text.append(page_text)
-    
-        extracted_text = '\n\n'.join(pages_text)
-
-        return extracted_text
+        return extract_pdf_pages_text(file)
     except Exception as e:
         logger.critical(f"\n{'='*80}\nEXCEPTION - WORKER EXTRACT_PDF_TEXT\nrequest id: {request_id}{e}\n{'='*80}")
         raise e
 
-def extract_image_text(request_id:str, filepaths: List[str]):
-    logger.info(f"\n{'='*80}\nEXTRACTING IMAGES TEXT - WORKER EXTRACT_IMAGE_TEXT\nrequest id: {request_id}\n{'='*80}")
+def extract_images_texts(request_id:str, image_groups: List[List[str]]) -> Tuple[List[str], List[float]]:
+    logger.info(f"\n{'='*80}\nEXTRACTING IMAGES TEXT - WORKER EXTRACT_IMAGES_TEXTS\nrequest id: {request_id}\n{'='*80}")
     try:
-        images_text = []
-        for image in filepaths:
-            pytesseract_config = '--oem 3 -l por+eng'
-            image = Image.open(image)
-            image_text = pytesseract.image_to_string(image, config=pytesseract_config)
-
-            images_text.append(image_text)
-    
-        extracted_text = '\n\n'.join(images_text)
-
-        return extracted_text
+        return ocr_image_groups_timed(image_groups)
 
     except Exception as e:
-        logger.critical(f"\n{'='*80}\nEXCEPTION - WORKER EXTRACT_IMAGE_TEXT\nrequest id: {request_id}\n{e}\n{'='*80}")
+        logger.critical(f"\n{'='*80}\nEXCEPTION - WORKER EXTRACT_IMAGES_TEXTS\nrequest id: {request_id}\n{e}\n{'='*80}")
         raise e
 
-def group_image_cvs(request_id: str, images_files: List[str]) -> dict:
+def group_image_cvs(request_id: str, images_files: List[StagedFileSchema]) -> dict:
     logger.info(f"\n{'='*80}\nGROUPING IMAGES - WORKER GROUP_IMAGE_CVS\nrequest id: {request_id}\n{'='*80}")
     same_cv_images = {}
 
-    for filepath in images_files:
-        image_filename = filepath[5:25]
+    for staged_file in images_files:
+        image_filename = staged_file.original_filename[:20]
 
         if image_filename in same_cv_images:
-            same_cv_images[image_filename].append(filepath)
+            same_cv_images[image_filename].append(staged_file.blob_key)
         else:
             same_cv_images[image_filename] = []
-            same_cv_images[image_filename].append(filepath)
+            same_cv_images[image_filename].append(staged_file.blob_key)
     
     return same_cv_images
 
-@app.task
-def summarize_cv(
+def fetch_cv_files(
     request_id: str,
-    pdf_files: List[str],
-    image_files: List[str],
-    query: Optional[str] = None
-) -> None:
-    start_time = time.monotonic()
+    cvs_files: List[Tuple[List[str], List[str]]]
+) -> Dict[str, str]:
+    logger.info(f"\n{'='*80}\nFETCHING CV FILES FROM BLOB STORE - WORKER FETCH_CV_FILES\nrequest id: {request_id}\n{'='*80}")
+    blob_store: BlobStore = get_blob_store()
+    blob_keys = [blob_key for pdf_files, image_files in cvs_files for blob_key in pdf_files + image_files]
+
+    return {blob_key: run_async(blob_store.fetch_to_local(blob_key)) for blob_key in blob_keys}
+
+def release_cv_files(local_paths: Dict[str, str]) -> None:
+    blob_store: BlobStore = get_blob_store()
+    for blob_key, local_path in local_paths.items():
+        run_async(blob_store.release_local(blob_key, local_path))
+
+def extract_cvs_texts(
+    request_id: str,
+    cvs_files: List[Tuple[List[str], List[str]]],
+    cv_ids: Optional[List[int]] = None
+) -> List[str]:
+    cv_ids = cv_ids if cv_ids is not None else list(range(len(cvs_files)))
+    cvs_texts = ['' for _ in cvs_files]
+    image_cvs_indexes = []
+
+    with measure_stage("fetch"):
+        local_paths = fetch_cv_files(request_id, cvs_files)
     try:
-        logger.info(f"\n{'='*80}\nINITIALIZING WORKER TASK - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{'='*80}")
-        log_repository: LogRepository = LogRepository()
-        gemini_service = GeminiLLM()
-        loop = asyncio.get_event_loop()
-        log_entry = loop.run_until_complete(log_repository.get_by_id(request_id, request_id))
+        with measure_stage("extract"):
+            for index, (pdf_files, image_files) in enumerate(cvs_files):
+                if pdf_files:
+                    start_time = time.perf_counter()
+                    cvs_texts[index] = extract_pdf_text(request_id, local_paths[pdf_files[0]])
+                    extraction_seconds = time.perf_counter() - start_time
+                    EXTRACTION_SECONDS.labels("pdf").observe(extraction_seconds)
+                    record_cv_metrics(cv_ids[index], extraction_method="pdf", extraction_seconds=extraction_seconds)
+                else:
+                    image_cvs_indexes.append(index)
+
+        if image_cvs_indexes:
+            with measure_stage("ocr"):
+                images_texts, images_seconds = extract_images_texts(
+                    request_id,
+                    [[local_paths[blob_key] for blob_key in cvs_files[index][1]] for index in image_cvs_indexes]
+                )
+            for index, image_text, seconds in zip(image_cvs_indexes, images_texts, images_seconds):
+                cvs_texts[index] = image_text
+                EXTRACTION_SECONDS.labels("ocr").observe(seconds)
+                record_cv_metrics(cv_ids[index], extraction_method="ocr", extraction_seconds=seconds)
 
-        logger.info(f"\n{'='*80}\nGROUPING SIMILAR IMAGE FILES - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{'='*80}")
-        
-        cvs_texts = []
-        cvs_summaries = []
-        cvs_analysis = []
+    finally:
+        with measure_stage("fetch"):
+            release_cv_files(local_paths)
 
-        same_cv_images = group_image_cvs(request_id, image_files)
+    return cvs_texts
 
-        logger.info(f"\n{'='*80}\nEXTRACTING PDF TEXTS - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{'='*80}")
-        for filepath in pdf_files:
-            cvs_texts.append(extract_pdf_text(request_id, filepath))
+def extract_cvs_texts_with_cache(
+    request_id: str,
+    cvs_files: List[Tuple[List[str], List[str]]],
+    file_hashes: Dict[str, str],
+    cv_ids: Optional[List[int]] = None
+) -> List[str]:
+    cv_ids = cv_ids if cv_ids is not None else list(range(len(cvs_files)))
+    if not env_config.EXTRACTION_CACHE_ENABLED:
+        return extract_cvs_texts(request_id, cvs_files, cv_ids)
+
+    logger.info(f"\n{'='*80}\nLOOKING UP CACHED TEXTS - WORKER EXTRACT_CVS_TEXTS_WITH_CACHE\nrequest id: {request_id}\n{'='*80}")
+    cache_keys = [
+        ExtractionCacheRepository.build_cache_key([file_hashes.get(blob_key) for blob_key in pdf_files + image_files])
+        for pdf_files, image_files in cvs_files
+    ]
+    with measure_stage("db"):
+        cached_texts = run_async(
+            ExtractionCacheRepository.get_many(request_id, [cache_key for cache_key in cache_keys if cache_key is not None])
+        )
 
-        logger.info(f"\n{'='*80}\nEXTRACTING IMAGE TEXTS - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{'='*80}")
-        for filepaths in same_cv_images.values():
-            cvs_texts.append(extract_image_text(request_id, filepaths))
-            
-        logger.info(f"\n{'='*80}\nSUMMARIZING CVS - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{'='*80}")
-        for cv in cvs_texts:
-            cv_summary: Summary = gemini_service.summarize_cv_texts(request_id, cv)
-            cvs_summaries.append(cv_summary)
-        
-        if query != "":
-            logger.info(f"\n{'='*80}\nRANKING CVS - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{'='*80}")
-            cvs_ranking: CVsAnalysis = gemini_service.rank_cvs(request_id, query, cvs_summaries)
-
-
-            logger.info(f"\n{'='*80}\nGROUPING SUMMARIES AND RANKING DATA ON CVS ANALYSIS DATA TYPE - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{'='*80}")
-            for summary_item, cv_analysis_item in zip(cvs_summaries, cvs_ranking.summaries):
-                combined_item = SummaryAndAnalysis(
-                    summary=summary_item.summary,
-                    strong_points=summary_item.strong_points,
-                    weak_points=summary_item.weak_points,
-                    
-                    
-                    cv_analysis=cv_analysis_item.cv_analysis,
-                    why_it_fits=cv_analysis_item.why_it_fits,
-                    things_to_watch_out=cv_analysis_item.things_to_watch_out,
-                    ranking_score=cv_analysis_item.score
+    missing_indexes = []
+    for index, cache_key in enumerate(cache_keys):
+        if cache_key in cached_texts:
+            record_cv_metrics(cv_ids[index], extraction_method="cache", extraction_seconds=0.0)
+        else:
+            missing_indexes.append(index)
+
+    missing_texts = extract_cvs_texts(
+        request_id,
+        [cvs_files[index] for index in missing_indexes],
+        [cv_ids[index] for index in missing_indexes]
+    )
+
+    cvs_texts = [cached_texts.get(cache_key, '') for cache_key in cache_keys]
+    new_texts = {}
+    for index, cv_text in zip(missing_indexes, missing_texts):
+        cvs_texts[index] = cv_text
+        if cache_keys[index] is not None:
+            new_texts[cache_keys[index]] = cv_text
+
+    with measure_stage("db"):
+        run_async(ExtractionCacheRepository.save_many(request_id, new_texts))
+
+    return cvs_texts
+
+def publish_partial_summaries(request_id: str, partial_results: List[PartialSummarySchema]) -> None:
+    if not partial_results:
+        return
+
+    # Best effort: a failed progress write must not fail the summarization itself
+    try:
+        with measure_stage("db"):
+            progress = run_async(LogRepository.push_partial_results(request_id, request_id, partial_results))
+    except Exception as e:
+        logger.error(f"\n{'='*80}\nFAILED TO PUBLISH PARTIAL SUMMARIES - WORKER PUBLISH_PARTIAL_SUMMARIES\nrequest id: {request_id}\n{e}\n{'='*80}")
+        return
+
+    if progress is None:
+        logger.warning(f"\n{'='*80}\nLOG IS NO LONGER PENDING, PARTIAL SUMMARIES DROPPED - WORKER PUBLISH_PARTIAL_SUMMARIES\nrequest id: {request_id}\n{'='*80}")
+        return
+
+    publish_log_event(LogEventSchema(
+        request_id=request_id,
+        status=ProcessStatusEnum.PENDING,
+        progress=progress,
+        partial_results=partial_results
+    ))
+
+def start_log_progress(request_id: str, total: int) -> None:
+    run_async(LogRepository.start_progress(request_id, request_id, total))
+    publish_log_event(LogEventSchema(
+        request_id=request_id,
+        status=ProcessStatusEnum.PENDING,
+        progress=ProgressSchema(total=total, completed=0)
+    ))
+
+def summarize_cvs_with_cache(
+    request_id: str,
+    llm_service: LLMProvider,
+    cvs_texts: List[str],
+    cv_ids: Optional[List[int]] = None
+) -> List[Summary]:
+    cv_ids = cv_ids if cv_ids is not None else list(range(len(cvs_texts)))
+    if not env_config.SUMMARY_CACHE_ENABLED:
+        with measure_stage("summarize"):
+            return llm_service.summarize_cvs_texts_concurrently(
+                request_id,
+                cvs_texts,
+                cv_ids,
+                on_summary=lambda cv_id, summary: publish_partial_summaries(request_id, [PartialSummarySchema(cv_id=cv_id, summary=summary)])
+            )
+
+    logger.info(f"\n{'='*80}\nLOOKING UP CACHED SUMMARIES - WORKER SUMMARIZE_CVS_WITH_CACHE\nrequest id: {request_id}\n{'='*80}")
+    cache_keys = [SummaryCacheRepository.build_cache_key(cv_text) for cv_text in cvs_texts]
+    with measure_stage("db"):
+        cached_summaries = run_async(SummaryCacheRepository.get_many(request_id, cache_keys))
+
+    missing_texts = {}
+    missing_cv_ids: Dict[str, List[int]] = {}
+    cached_results = []
+    for cv_id, cache_key, cv_text in zip(cv_ids, cache_keys, cvs_texts):
+        record_cv_metrics(cv_id, summary_cached=cache_key in cached_summaries)
+        if cache_key in cached_summaries:
+            cached_results.append(PartialSummarySchema(cv_id=cv_id, summary=cached_summaries[cache_key]))
+        else:
+            missing_texts.setdefault(cache_key, cv_text)
+            missing_cv_ids.setdefault(cache_key, []).append(cv_id)
+
+    publish_partial_summaries(request_id, cached_results)
+
+    # CVs with the same text are summarized once, by the first of them, and published for all of them
+    same_text_cv_ids = {same_cv_ids[0]: same_cv_ids for same_cv_ids in missing_cv_ids.values()}
+    with measure_stage("summarize"):
+        new_summaries = dict(zip(
+            missing_texts.keys(),
+            llm_service.summarize_cvs_texts_concurrently(
+                request_id,
+                list(missing_texts.values()),
+                list(same_text_cv_ids.keys()),
+                on_summary=lambda cv_id, summary: publish_partial_summaries(
+                    request_id,
+                    [PartialSummarySchema(cv_id=same_cv_id, summary=summary) for same_cv_id in same_text_cv_ids[cv_id]]
                 )
-                cvs_analysis.append(combined_item)
+            )
+        ))
+    with measure_stage("db"):
+        run_async(SummaryCacheRepository.save_many(request_id, new_summaries))
+
+    cached_summaries.update(new_summaries)
+    return [cached_summaries[cache_key] for cache_key in cache_keys]
+
+def build_cvs_result(
+    request_id: str,
+    llm_service: LLMProvider,
+    cvs_summaries: List[Summary],
+    query: Optional[str] = None
+) -> SummaryResponse | CVsAnalysisResponse:
+    if query:
+        similarity_scores = None
+        ranked_indexes = list(range(len(cvs_summaries)))
+
+        if env_config.PRE_RANKING_ENABLED and cvs_summaries:
+            logger.info(f"\n{'='*80}\nPRE-RANKING CVS BY EMBEDDING SIMILARITY - WORKER BUILD_CVS_RESULT\nrequest id: {request_id}\n{'='*80}")
+            with measure_stage("pre_rank"):
+                similarity_scores = get_pre_ranker().score(request_id, query, cvs_summaries).tolist()
+            ranked_indexes = sorted(
+                sorted(ranked_indexes, key=lambda index: similarity_scores[index], reverse=True)[:env_config.PRE_RANKING_TOP_K]
+            )
 
-            cvs_ranking_response: CVsAnalysisResponse =  CVsAnalysisResponse(
-                cvs_analysis_process=cvs_ranking.cvs_analysis,
-                cvs_analysis=cvs_analysis
+        logger.info(f"\n{'='*80}\nRANKING CVS - WORKER BUILD_CVS_RESULT\nrequest id: {request_id}\n{'='*80}")
+        with measure_stage("rank"):
+            cvs_analysis_process, cvs_ranking = rank_cvs_tournament(
+                request_id,
+                llm_service,
+                query,
+                {index: cvs_summaries[index] for index in ranked_indexes}
             )
 
+        cvs_analysis = []
 
-            logger.info(f"\n{'='*80}\nSORTING CVS ANALYSIS BY SCORE - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{'='*80}")
-            cvs_ranking_response.cvs_analysis.sort(
-                key=lambda cv_analysis: cv_analysis.ranking_score,
-                reverse=True
+        logger.info(f"\n{'='*80}\nGROUPING SUMMARIES AND RANKING DATA ON CVS ANALYSIS DATA TYPE - WORKER BUILD_CVS_RESULT\nrequest id: {request_id}\n{'='*80}")
+        for cv_analysis_item in cvs_ranking:
+            summary_item = cvs_summaries[cv_analysis_item.cv_id]
+            combined_item = SummaryAndAnalysis(
+                summary=summary_item.summary,
+                strong_points=summary_item.strong_points,
+                weak_points=summary_item.weak_points,
+                
+                
+                cv_analysis=cv_analysis_item.cv_analysis,
+                why_it_fits=cv_analysis_item.why_it_fits,
+                things_to_watch_out=cv_analysis_item.things_to_watch_out,
+                ranking_score=cv_analysis_item.score,
+                similarity_score=similarity_scores[cv_analysis_item.cv_id] if similarity_scores is not None else None
             )
+            cvs_analysis.append(combined_item)
+
+        analyzed_indexes = {cv_analysis_item.cv_id for cv_analysis_item in cvs_ranking}
+        not_analyzed_indexes = sorted(
+            set(range(len(cvs_summaries))) - analyzed_indexes,
+            key=lambda index: similarity_scores[index] if similarity_scores is not None else 0.0,
+            reverse=True
+        )
+        for index in not_analyzed_indexes:
+            summary_item = cvs_summaries[index]
+            if index in ranked_indexes:
+                cv_analysis = "A LLM não retornou a análise deste currículo."
+            else:
+                cv_analysis = f"Currículo não enviado para a análise detalhada da LLM, pois não ficou entre os {env_config.PRE_RANKING_TOP_K} currículos mais similares à descrição da vaga."
+
+            cvs_analysis.append(SummaryAndAnalysis(
+                summary=summary_item.summary,
+                strong_points=summary_item.strong_points,
+                weak_points=summary_item.weak_points,
+                cv_analysis=cv_analysis,
+                why_it_fits="",
+                things_to_watch_out="",
+                similarity_score=similarity_scores[index] if similarity_scores is not None else None
+            ))
+
+        cvs_ranking_response: CVsAnalysisResponse =  CVsAnalysisResponse(
+            cvs_analysis_process=cvs_analysis_process,
+            cvs_analysis=cvs_analysis
+        )
+
+        return cvs_ranking_response
+
+    logger.info(f"\n{'='*80}\nORGANIZING AND SORTING CVS SUMMARIES BY SCORE - WORKER BUILD_CVS_RESULT\nrequest id: {request_id}\n{'='*80}")
+    summaries: SummaryResponse = SummaryResponse(summaries=cvs_summaries)
+    summaries.summaries.sort(
+        key=lambda cv_summary: cv_summary.score,
+        reverse=True
+    )
 
-            logger.info(f"\n{'='*80}\nUPDATING CVS ANALYSIS LOG - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{'='*80}")
+    return summaries
 
+class LogNotPendingError(Exception):
+    pass
+
+def mark_log_as_failed(request_id: str, metrics: Optional[ProcessingMetricsSchema] = None) -> None:
+    log_update_data: UpdateLogSchema = UpdateLogSchema(
+        updated_at=datetime.utcnow(),
+        result=None,
+        status=ProcessStatusEnum.FAILED,
+        metrics=metrics
+    )
+
+    # Only the first failure of a request is written and published: terminal logs may already be cached
+    if not run_async(LogRepository.update_if_pending(request_id, request_id, log_update_data)):
+        logger.warning(f"\n{'='*80}\nLOG IS NOT PENDING, NOT MARKED AS FAILED - WORKER MARK_LOG_AS_FAILED\nrequest id: {request_id}\n{'='*80}")
+        return
+
+    publish_log_event(LogEventSchema(request_id=request_id, status=ProcessStatusEnum.FAILED))
+
+def ensure_log_pending(request_id: str) -> None:
+    with measure_stage("db"):
+        log_status = run_async(LogRepository.get_status(request_id, request_id))
+
+    if log_status != ProcessStatusEnum.PENDING:
+        raise LogNotPendingError(f"Log is {log_status.value if log_status else 'missing'}, skipping the CV")
+
+def dispatch_cvs_chord(
+    request_id: str,
+    cvs_files: List[Tuple[List[str], List[str]]],
+    file_hashes: Dict[str, str],
+    query: Optional[str] = None
+) -> None:
+    logger.info(f"\n{'='*80}\nFANNING OUT CVS SUMMARIZATION - WORKER DISPATCH_CVS_CHORD\nrequest id: {request_id}\n{'='*80}")
+    header = [
+        summarize_single_cv.s(
+            request_id,
+            pdf_files,
+            image_files,
+            {blob_key: file_hashes[blob_key] for blob_key in pdf_files + image_files if blob_key in file_hashes},
+            cv_id
+        )
+        for cv_id, (pdf_files, image_files) in enumerate(cvs_files)
+    ]
+
+    # The request blobs are deleted by the chord body, or by its error callback when a CV fails
+    chord(header)(finalize_cvs_summarization.s(request_id, query).on_error(cleanup_failed_cvs_chord.s(request_id)))
+
+def finish_metrics(request_metrics: RequestMetrics, log_entry: Optional[CVsAnalysisLogs]) -> ProcessingMetricsSchema:
+    if log_entry is not None:
+        request_metrics.add_stage("total", (datetime.utcnow() - log_entry.created_at).total_seconds())
+
+    return request_metrics.to_schema()
+
+@app.task
+def summarize_single_cv(
+    request_id: str,
+    pdf_files: List[str],
+    image_files: List[str],
+    file_hashes: Optional[Dict[str, str]] = None,
+    cv_id: int = 0
+) -> dict:
+    """Returns the CV summary and the metrics collected for it (with its stage intervals), merged by finalize_cvs_summarization."""
+    with collect_request_metrics() as request_metrics:
+        try:
+            logger.info(f"\n{'='*80}\nSUMMARIZING SINGLE CV - WORKER SUMMARIZE_SINGLE_CV\nrequest id: {request_id}\n{'='*80}")
+            llm_service = get_llm_provider()
+
+            # A sibling sub-task may have failed the request already, then this CV is not worth extracting nor summarizing
+            ensure_log_pending(request_id)
+            cv_text = extract_cvs_texts_with_cache(request_id, [(pdf_files, image_files)], file_hashes or {}, [cv_id])[0]
+            ensure_log_pending(request_id)
+            cv_summary: Summary = summarize_cvs_with_cache(request_id, llm_service, [cv_text], [cv_id])[0]
+
+            return {
+                "summary": cv_summary.model_dump(),
+                "metrics": request_metrics.to_schema().model_dump(),
+                "stage_intervals": request_metrics.stage_intervals
+            }
+
+        except Exception as e:
+            if isinstance(e, LogNotPendingError):
+                logger.warning(f"\n{'='*80}\nLOG IS NOT PENDING - WORKER SUMMARIZE_SINGLE_CV\nrequest id: {request_id}\n{e}\n{'='*80}")
+            else:
+                logger.critical(f"\n{'='*80}\nEXCEPTION - WORKER SUMMARIZE_SINGLE_CV\nrequest id: {request_id}\n{e}\n{'='*80}")
+                mark_log_as_failed(request_id, request_metrics.to_schema())
+            # Only the blobs of this CV: the other sub-tasks of the chord may still be fetching theirs
+            blob_store: BlobStore = get_blob_store()
+            for blob_key in pdf_files + image_files:
+                run_async(blob_store.delete(blob_key))
+            raise e
+
+@app.task
+def cleanup_failed_cvs_chord(task_request, exc, traceback, request_id: str) -> None:
+    """Error callback of the chord body, called once when a CV sub-task fails and the body is not run."""
+    logger.critical(f"\n{'='*80}\nCVS CHORD FAILED - WORKER CLEANUP_FAILED_CVS_CHORD\nrequest id: {request_id}\n{exc}\n{'='*80}")
+    run_async(get_blob_store().delete_prefix(request_id))
+
+@app.task
+def finalize_cvs_summarization(
+    cvs_results: List[dict],
+    request_id: str,
+    query: Optional[str] = None
+) -> None:
+    start_time = time.monotonic()
+    log_entry = None
+    with collect_request_metrics() as request_metrics:
+        try:
+            logger.info(f"\n{'='*80}\nFINALIZING CVS SUMMARIZATION - WORKER FINALIZE_CVS_SUMMARIZATION\nrequest id: {request_id}\n{'='*80}")
+            log_repository: LogRepository = LogRepository()
+            llm_service = get_llm_provider()
+            with measure_stage("db"):
+                log_entry = run_async(log_repository.get_by_id(request_id, request_id))
+
+            for cv_result in cvs_results:
+                request_metrics.merge(ProcessingMetricsSchema(**cv_result["metrics"]), cv_result.get("stage_intervals"))
+
+            summaries: List[Summary] = [Summary(**cv_result["summary"]) for cv_result in cvs_results]
+            result = build_cvs_result(request_id, llm_service, summaries, query)
+
+            logger.info(f"\n{'='*80}\nUPDATING CVS LOG - WORKER FINALIZE_CVS_SUMMARIZATION\nrequest id: {request_id}\n{'='*80}")
             log_update_data: UpdateLogSchema = UpdateLogSchema(
                 updated_at=datetime.utcnow(),
-                result=cvs_ranking_response,
-                status=ProcessStatusEnum.SUCCESS
+                result=result,
+                status=ProcessStatusEnum.SUCCESS,
+                metrics=finish_metrics(request_metrics, log_entry),
+                partial_results=[]
             )
 
-            loop.run_until_complete(log_repository.update(request_id, log_entry, log_update_data))
-        
-        else:
-            logger.info(f"\n{'='*80}\nORGANIZING AND SORTING CVS SUMMARIES BY SCORE - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{'='*80}")
-            summaries: SummaryResponse = SummaryResponse(summaries=cvs_summaries)
-            summaries.summaries.sort(
-                key=lambda cv_summary: cv_summary.score,
-                reverse=True
-            )
-            
-            logger.info(f"\n{'='*80}\nUPDATING CVS SUMMARIES LOG - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{'='*80}")
+            run_async(log_repository.update(request_id, log_entry, log_update_data))
+            publish_log_event(LogEventSchema(request_id=request_id, status=ProcessStatusEnum.SUCCESS))
+
+        except Exception as e:
+            logger.critical(f"\n{'='*80}\nEXCEPTION - WORKER FINALIZE_CVS_SUMMARIZATION\nrequest id: {request_id}\n{e}\n{'='*80}")
+            mark_log_as_failed(request_id, finish_metrics(request_metrics, log_entry))
+            raise e
+
+        finally:
+            run_async(get_blob_store().delete_prefix(request_id))
+
+            logger.info(f"\n{'='*80}\nFINALIZED CVS IN {time.monotonic()-start_time:.2f}s - WORKER FINALIZE_CVS_SUMMARIZATION\nrequest id: {request_id}\n{'='*80}")
+
+@app.task
+def summarize_cv(
+    request_id: str,
+    manifest: List[dict],
+    query: Optional[str] = None
+) -> None:
+    staged_files: List[StagedFileSchema] = [StagedFileSchema(**staged_file) for staged_file in manifest]
+    file_hashes = {staged_file.blob_key: staged_file.sha256 for staged_file in staged_files}
+
+    pdf_files = [staged_file.blob_key for staged_file in staged_files if staged_file.content_type == "application/pdf"]
+    same_cv_images = group_image_cvs(
+        request_id,
+        [staged_file for staged_file in staged_files if staged_file.content_type != "application/pdf"]
+    )
+    cvs_files = [([filepath], []) for filepath in pdf_files] + [([], filepaths) for filepaths in same_cv_images.values()]
+
+    if env_config.SUMMARIZATION_FAN_OUT:
+        try:
+            start_log_progress(request_id, len(cvs_files))
+            dispatch_cvs_chord(request_id, cvs_files, file_hashes, query)
+        except Exception as e:
+            logger.critical(f"\n{'='*80}\nEXCEPTION DISPATCHING CVS CHORD - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{e}\n{'='*80}")
+            mark_log_as_failed(request_id)
+            run_async(get_blob_store().delete_prefix(request_id))
+            raise e
+
+        return
+
+    start_time = time.monotonic()
+    log_entry = None
+    with collect_request_metrics() as request_metrics:
+        try:
+            logger.info(f"\n{'='*80}\nINITIALIZING WORKER TASK - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{'='*80}")
+            log_repository: LogRepository = LogRepository()
+            llm_service = get_llm_provider()
+            with measure_stage("db"):
+                log_entry = run_async(log_repository.get_by_id(request_id, request_id))
+                start_log_progress(request_id, len(cvs_files))
+
+            logger.info(f"\n{'='*80}\nEXTRACTING CVS TEXTS - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{'='*80}")
+            cvs_texts = extract_cvs_texts_with_cache(request_id, cvs_files, file_hashes)
+                
+            logger.info(f"\n{'='*80}\nSUMMARIZING CVS - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{'='*80}")
+            cvs_summaries: List[Summary] = summarize_cvs_with_cache(request_id, llm_service, cvs_texts)
+
+            result = build_cvs_result(request_id, llm_service, cvs_summaries, query)
+
+            logger.info(f"\n{'='*80}\nUPDATING CVS LOG - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{'='*80}")
 
             log_update_data: UpdateLogSchema = UpdateLogSchema(
                 updated_at=datetime.utcnow(),
-                result=summaries,
-                status=ProcessStatusEnum.SUCCESS
+                result=result,
+                status=ProcessStatusEnum.SUCCESS,
+                metrics=finish_metrics(request_metrics, log_entry),
+                partial_results=[]
             )
 
-            loop.run_until_complete(log_repository.update(request_id, log_entry, log_update_data))
-    
-    except Exception as e:
-        logger.critical(f"\n{'='*80}\nEXCEPTION - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{e}\n{'='*80}")
+            run_async(log_repository.update(request_id, log_entry, log_update_data))
+            publish_log_event(LogEventSchema(request_id=request_id, status=ProcessStatusEnum.SUCCESS))
         
-        log_entry = loop.run_until_complete(log_repository.get_by_id(request_id, request_id))
-        log_update_data: UpdateLogSchema = UpdateLogSchema(
-            result=None,
-            status=ProcessStatusEnum.FAILED
-        )
-
-        loop.run_until_complete(log_repository.update(request_id, log_entry, log_update_data))
-
-        raise e
-
-    finally:
-        for filepath in pdf_files:
-            if os.path.exists(filepath):
-                os.remove(filepath)
+        except Exception as e:
+            logger.critical(f"\n{'='*80}\nEXCEPTION - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{e}\n{'='*80}")
+            mark_log_as_failed(request_id, finish_metrics(request_metrics, log_entry))
+            raise e
 
-        for filepath in image_files:
-            if os.path.exists(filepath):
-                os.remove(filepath)
+        finally:
+            run_async(get_blob_store().delete_prefix(request_id))
 
-        logger.info(f"\n{'='*80}\nPROCESSED CVS IN {time.monotonic()-start_time:.2f}s - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{'='*80}")
\ No newline at end of file
+            logger.info(f"\n{'='*80}\nPROCESSED CVS IN {time.monotonic()-start_time:.2f}s - WORKER SUMMARIZE_CV\nrequest id: {request_id}\n{'='*80}")